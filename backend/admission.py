@@ -0,0 +1,98 @@
+"""
+Admission control for the analysis endpoint.
+
+At most ``max_concurrent`` analyses run at once; up to ``max_waiting`` more
+wait for a slot for no longer than ``queue_timeout`` seconds. Anything
+beyond that is turned away immediately with a retry hint, so a traffic
+spike queues briefly or is rejected instead of slowing every request.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+
+class AdmissionRejected(Exception):
+    """The request was not admitted; ``status`` and ``retry_after`` shape the response"""
+
+    def __init__(self, reason: str, status: int, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded, time-limited wait queue"""
+
+    def __init__(self, max_concurrent: int = 4, max_waiting: int = 16, queue_timeout: float = 5.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_waiting = max(0, max_waiting)
+        self.queue_timeout = queue_timeout
+        self._slots = threading.Condition()
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.peak_in_flight = 0
+        self._wait_total = 0.0
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait before retrying"""
+        return max(1, int(round(self.queue_timeout)))
+
+    @contextmanager
+    def admit(self):
+        """Hold an analysis slot for the duration of the block or raise AdmissionRejected"""
+        self._acquire()
+        try:
+            yield
+        finally:
+            with self._slots:
+                self.in_flight -= 1
+                self._slots.notify()
+
+    def _acquire(self):
+        with self._slots:
+            if self.in_flight < self.max_concurrent and not self.waiting:
+                self._enter(0.0)
+                return
+
+            if self.waiting >= self.max_waiting:
+                self.rejected_queue_full += 1
+                raise AdmissionRejected('Server is busy, too many analyses waiting', 429, self.retry_after())
+
+            self.waiting += 1
+            started = time.monotonic()
+            try:
+                admitted = self._slots.wait_for(lambda: self.in_flight < self.max_concurrent, self.queue_timeout)
+            finally:
+                self.waiting -= 1
+            if not admitted:
+                self.rejected_timeout += 1
+                raise AdmissionRejected('Timed out waiting for an analysis slot', 503, self.retry_after())
+            self._enter(time.monotonic() - started)
+
+    def _enter(self, waited: float):
+        """Take a slot (lock held)"""
+        self.in_flight += 1
+        self.admitted += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self._wait_total += waited
+
+    def stats(self) -> Dict:
+        with self._slots:
+            return {
+                'max_concurrent': self.max_concurrent,
+                'max_waiting': self.max_waiting,
+                'queue_timeout_seconds': self.queue_timeout,
+                'in_flight': self.in_flight,
+                'waiting': self.waiting,
+                'peak_in_flight': self.peak_in_flight,
+                'admitted': self.admitted,
+                'rejected_queue_full': self.rejected_queue_full,
+                'rejected_timeout': self.rejected_timeout,
+                'mean_wait_ms': round(1000 * self._wait_total / self.admitted, 2) if self.admitted else 0.0
+            }
@@ -1,20 +1,19 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, g
 from flask_cors import CORS
-import cv2
-import numpy as np
 import base64
-from PIL import Image
-import io
 import sqlite3
 import uuid
 from datetime import datetime
 import json
 import sys
 import os
+import hashlib
 
 # Try different skin analyzers in order of preference
+tracking_sessions = None
 try:
-    from skin_analyzer_opencv import OpenCVSkinAnalyzer as SkinAnalyzer
+    from skin_analyzer_opencv import OpenCVSkinAnalyzer as SkinAnalyzer, TrackingSessions
+    tracking_sessions = TrackingSessions()
     print("✅ Using pure OpenCV skin analyzer (no compilation required)")
 except ImportError:
     try:
@@ -27,7 +26,16 @@ except ImportError:
         except ImportError:
             raise RuntimeError("No skin analyzer available. Please install required dependencies.")
 
-from database import Database
+from database import Database, DEFAULT_HISTORY_FIELDS
+from catalog import ProductCatalog
+from recommender import Recommender
+from result_cache import ResultCache
+from http_cache import EncodedBody, VersionedBody, negotiate_encoding
+from issues import SkinIssue, as_issue, dumps, dumps_analysis
+from jobs import JobQueue, QueueFullError
+from admission import AdmissionController, AdmissionRejected
+from image_decode import decode_image, ImageDecodeError, DEFAULT_MAX_SIDE
+import timing
 
 # Verify Python version
 print(f"Running on Python {sys.version}")
@@ -41,105 +49,242 @@ CORS(app)
 db = Database()
 skin_analyzer = SkinAnalyzer()
 
-@app.route('/api/analyze', methods=['POST'])
-def analyze_skin():
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'No JSON data provided'}), 400
-            
-        image_data = data.get('image')
-        
-        if not image_data:
-            return jsonify({'error': 'No image data provided'}), 400
-        
-        print(f"🔄 Processing image analysis request...")
+# Products served from memory; reloaded when the products table changes
+catalog = ProductCatalog(db, check_interval=float(os.environ.get('CATALOG_CHECK_INTERVAL', 1)))
+
+# Confidence-weighted top-k ranking; optionally cap products per category
+recommender = Recommender(catalog, max_per_category=int(os.environ.get('RECOMMEND_MAX_PER_CATEGORY', 0)) or None)
+
+# Rankings depend only on the issue signature and catalog version, so a
+# few dozen entries cover most traffic; cleared when the catalog changes
+recommendation_cache = ResultCache(
+    max_entries=int(os.environ.get('RECOMMENDATION_CACHE_ENTRIES', 1024)),
+    max_bytes=8 * 1024 * 1024,
+    ttl=float(os.environ.get('RECOMMENDATION_CACHE_TTL', 3600))
+)
+recommendation_cache_version = None
+
+# Seconds browsers and CDNs may reuse a recommendation response unchecked
+RECOMMENDATION_MAX_AGE = int(os.environ.get('RECOMMENDATION_MAX_AGE', 300))
+
+# Serialized (and lazily compressed) /api/products and /api/analyses/recent
+# bodies, rebuilt only when the catalog or the analyses change
+products_body = VersionedBody('products')
+recent_analyses_body = VersionedBody('recent')
+
+# Bound concurrent synchronous analyses; extra requests wait briefly or are rejected
+admission = AdmissionController(
+    max_concurrent=int(os.environ.get('ANALYZE_MAX_CONCURRENT', os.cpu_count() or 4)),
+    max_waiting=int(os.environ.get('ANALYZE_MAX_WAITING', 16)),
+    queue_timeout=float(os.environ.get('ANALYZE_QUEUE_TIMEOUT', 5))
+)
+
+# Background analysis jobs for POST /api/analyze/jobs
+job_queue = JobQueue(
+    workers=int(os.environ.get('ANALYSIS_JOB_WORKERS', 2)),
+    max_queue=int(os.environ.get('ANALYSIS_JOB_QUEUE', 64))
+)
+
+# Uploads are analyzed at no more than this many pixels on the longer side
+IMAGE_MAX_SIDE = DEFAULT_MAX_SIDE
+
+# Duplicate uploads (kiosk retries) are answered from this cache; the key
+# includes the analyzer version and settings so results never go stale
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('RESULT_CACHE_ENTRIES', 256)),
+    max_bytes=int(float(os.environ.get('RESULT_CACHE_MB', 32)) * 1024 * 1024),
+    ttl=float(os.environ.get('RESULT_CACHE_TTL', 300))
+)
+analyzer_signature = json.dumps({
+    'analyzer': SkinAnalyzer.__name__,
+    'version': getattr(SkinAnalyzer, 'VERSION', None),
+    'settings': getattr(skin_analyzer, 'settings', None),
+    'image_max_side': IMAGE_MAX_SIDE
+}, sort_keys=True)
+
+@app.before_request
+def start_timing():
+    g.timings = timing.start_request()
+
+@app.after_request
+def add_server_timing(response):
+    header = timing.finish_request(g.pop('timings', None))
+    if header:
+        response.headers['Server-Timing'] = header
+    return response
+
+# Upload types accepted as a raw request body
+RAW_IMAGE_MIMETYPES = {'image/jpeg', 'image/png', 'image/webp', 'application/octet-stream'}
+
+def read_image_upload():
+    """
+    Return (image_bytes, session_id, error_response) for an analyze request.
+    
+    The image may be sent as a raw image/* body, as the ``image`` file of a
+    multipart form, or as a base64 data URL in a JSON body.
+    """
+    if request.mimetype in RAW_IMAGE_MIMETYPES:
+        # Raw bytes straight from the request stream, no base64 detour
+        with timing.stage('read'):
+            image_bytes = request.get_data(cache=False)
+        session_id = request.args.get('session_id') or request.headers.get('X-Session-Id')
+        if not image_bytes:
+            return None, None, (jsonify({'error': 'No image data provided'}), 400)
+        return image_bytes, session_id, None
+    
+    if request.mimetype == 'multipart/form-data':
+        with timing.stage('read'):
+            upload = request.files.get('image')
+            image_bytes = upload.read() if upload else None
+        if not image_bytes:
+            return None, None, (jsonify({'error': 'No image data provided'}), 400)
+        return image_bytes, request.form.get('session_id'), None
+    
+    with timing.stage('parse'):
+        data = request.get_json(silent=True)
+    if not data:
+        return None, None, (jsonify({'error': 'No JSON data provided'}), 400)
         
-        # Decode base64 image
-        try:
+    image_data = data.get('image')
+    
+    if not image_data:
+        return None, None, (jsonify({'error': 'No image data provided'}), 400)
+    
+    # Decode base64 image
+    try:
+        with timing.stage('decode'):
             if ',' in image_data:
                 image_data = image_data.split(',')[1]
             image_bytes = base64.b64decode(image_data)
-            image = Image.open(io.BytesIO(image_bytes))
-            print(f"✅ Image decoded successfully: {image.size}")
-        except Exception as e:
-            print(f"❌ Image decoding error: {e}")
-            return jsonify({'error': 'Invalid image data'}), 400
+    except Exception as e:
+        print(f"❌ Image decoding error: {e}")
+        return None, None, (jsonify({'error': 'Invalid image data'}), 400)
+    return image_bytes, data.get('session_id'), None
+
+def run_analysis(opencv_image, decode_scale: float, cache_key: str, session_id=None, progress=None) -> bytes:
+    """
+    Analyze a decoded image, save it and return the JSON response body.
+    ``progress(stage, fraction)`` is called as the pipeline advances.
+    """
+    report = progress or (lambda stage, fraction: None)
+    
+    # Analyze skin issues
+    analysis_failed = False
+    try:
+        print("🔍 Starting skin analysis...")
+        report('analyzing', 0.1)
+        if session_id and tracking_sessions is not None:
+            # Live preview: follow the face from the previous frame
+            tracker = tracking_sessions.get(str(session_id))
+            issues = skin_analyzer.detect_skin_issues(opencv_image, tracker=tracker)
+        else:
+            issues = skin_analyzer.detect_skin_issues(opencv_image)
+        print(f"✅ Analysis completed: {len(issues)} issues detected")
         
-        # Convert PIL image to OpenCV format
-        try:
-            opencv_image = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-            print(f"✅ Image converted to OpenCV format: {opencv_image.shape}")
-        except Exception as e:
-            print(f"❌ Image conversion error: {e}")
-            return jsonify({'error': 'Image conversion failed'}), 400
+        # Fallback analyzers still return dicts
+        issues = [as_issue(issue) for issue in issues]
         
-        # Analyze skin issues
-        try:
-            print("🔍 Starting skin analysis...")
-            issues = skin_analyzer.detect_skin_issues(opencv_image)
-            print(f"✅ Analysis completed: {len(issues)} issues detected")
-            
-            # Convert NumPy types to Python native types for JSON serialization
-            def convert_to_json_serializable(obj):
-                if isinstance(obj, np.integer):
-                    return int(obj)
-                elif isinstance(obj, np.floating):
-                    return float(obj)
-                elif isinstance(obj, np.ndarray):
-                    return obj.tolist()
-                elif isinstance(obj, dict):
-                    return {key: convert_to_json_serializable(value) for key, value in obj.items()}
-                elif isinstance(obj, list):
-                    return [convert_to_json_serializable(item) for item in obj]
-                else:
-                    return obj
-            
-            # Convert all NumPy types in issues to JSON-serializable types
-            issues = convert_to_json_serializable(issues)
-            
-        except Exception as e:
-            print(f"❌ Skin analysis error: {e}")
-            import traceback
-            traceback.print_exc()
-            # Return mock data if analysis fails
-            issues = [
-                {
-                    'id': 'mock_1',
-                    'type': 'acne',
-                    'confidence': 0.7,
-                    'bbox': {'x': 100, 'y': 100, 'width': 30, 'height': 30}
-                }
-            ]
+        # Report boxes in the coordinates of the uploaded image
+        if decode_scale != 1.0:
+            issues = [issue.scaled(1 / decode_scale) for issue in issues]
         
-        # Create analysis result
-        analysis_id = str(uuid.uuid4())
-        timestamp = datetime.now().isoformat()
+    except Exception as e:
+        print(f"❌ Skin analysis error: {e}")
+        import traceback
+        traceback.print_exc()
+        # Return mock data if analysis fails
+        analysis_failed = True
+        issues = [SkinIssue('mock_1', 'acne', 0.7, 100, 100, 30, 30)]
+    
+    # Create analysis result
+    analysis_id = str(uuid.uuid4())
+    timestamp = datetime.now().isoformat()
+    
+    # Determine severity based on number and confidence of issues
+    severity = 'low'
+    if len(issues) > 3:
+        severity = 'high'
+    elif len(issues) > 1:
+        severity = 'medium'
+    
+    analysis_result = {
+        'id': analysis_id,
+        'timestamp': timestamp,
+        'issues': issues,
+        'recommendations': [],
+        'severity': severity
+    }
+    
+    # Encode once for the response and the result cache
+    with timing.stage('serialize'):
+        body = dumps_analysis(analysis_result)
+    body = body.encode('utf-8')
+    
+    # Save analysis to database
+    report('saving', 0.9)
+    try:
+        with timing.stage('db_save'):
+            db.save_analysis(analysis_result)
+        print(f"✅ Analysis saved to database with ID: {analysis_id}")
+    except Exception as e:
+        print(f"⚠️ Database save error: {e}")
+        # Continue even if database save fails
+    
+    # Mock fallbacks are never cached
+    if not analysis_failed:
+        result_cache.put(cache_key, body)
+    return body
+
+def prepare_upload():
+    """
+    Read the upload and check the result cache.
+    Returns (cache_key, cached_body, session_id, image_bytes, error_response).
+    """
+    image_bytes, session_id, error = read_image_upload()
+    if error:
+        return None, None, None, None, error
+    
+    # Same image bytes analyzed before: reuse the stored response
+    with timing.stage('cache'):
+        cache_key = ResultCache.make_key(image_bytes, analyzer_signature)
+        cached_body = result_cache.get(cache_key)
+    return cache_key, cached_body, session_id, image_bytes, None
+
+def decode_upload(image_bytes: bytes):
+    """Decode straight to an OpenCV BGR image at working resolution"""
+    with timing.stage('image_decode'):
+        opencv_image, decode_scale = decode_image(image_bytes, max_side=IMAGE_MAX_SIDE)
+    print(f"✅ Image decoded to OpenCV format: {opencv_image.shape}")
+    return opencv_image, decode_scale
+
+@app.route('/api/analyze', methods=['POST'])
+def analyze_skin():
+    try:
+        cache_key, cached_body, session_id, image_bytes, error = prepare_upload()
+        if error:
+            return error
         
-        # Determine severity based on number and confidence of issues
-        severity = 'low'
-        if len(issues) > 3:
-            severity = 'high'
-        elif len(issues) > 1:
-            severity = 'medium'
+        print(f"🔄 Processing image analysis request...")
         
-        analysis_result = {
-            'id': analysis_id,
-            'timestamp': timestamp,
-            'issues': issues,
-            'recommendations': [],
-            'severity': severity
-        }
+        if cached_body is not None:
+            print("✅ Returning cached analysis for duplicate image")
+            return app.response_class(cached_body, mimetype='application/json')
         
-        # Save analysis to database
         try:
-            db.save_analysis(analysis_result)
-            print(f"✅ Analysis saved to database with ID: {analysis_id}")
-        except Exception as e:
-            print(f"⚠️ Database save error: {e}")
-            # Continue even if database save fails
-        
-        return jsonify(analysis_result)
+            with admission.admit():
+                try:
+                    opencv_image, decode_scale = decode_upload(image_bytes)
+                except ImageDecodeError as e:
+                    print(f"❌ Image decoding error: {e}")
+                    return jsonify({'error': 'Invalid image data'}), 400
+                
+                body = run_analysis(opencv_image, decode_scale, cache_key, session_id)
+        except AdmissionRejected as e:
+            print(f"⚠️ Analysis rejected: {e.reason}")
+            response = jsonify({'error': e.reason})
+            response.headers['Retry-After'] = str(e.retry_after)
+            return response, e.status
+        return app.response_class(body, mimetype='application/json')
         
     except Exception as e:
         print(f"❌ Analysis endpoint error: {str(e)}")
@@ -147,6 +292,121 @@ def analyze_skin():
         traceback.print_exc()
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
+def job_links(job_id: str) -> dict:
+    return {
+        'job_id': job_id,
+        'status_url': f'/api/analyze/jobs/{job_id}',
+        'events_url': f'/api/analyze/jobs/{job_id}/events'
+    }
+
+@app.route('/api/analyze/jobs', methods=['POST'])
+def submit_analysis_job():
+    try:
+        cache_key, cached_body, session_id, image_bytes, error = prepare_upload()
+        if error:
+            return error
+        
+        if cached_body is not None:
+            job = job_queue.add_finished(cached_body)
+        else:
+            # Decode now so bad uploads fail fast and the queue holds pixels
+            try:
+                opencv_image, decode_scale = decode_upload(image_bytes)
+            except ImageDecodeError as e:
+                print(f"❌ Image decoding error: {e}")
+                return jsonify({'error': 'Invalid image data'}), 400
+            del image_bytes
+            
+            def work(job):
+                return run_analysis(opencv_image, decode_scale, cache_key, session_id,
+                                    progress=lambda stage, fraction: job_queue.update(job, stage, fraction))
+            
+            try:
+                job = job_queue.submit(work)
+            except QueueFullError as e:
+                print(f"⚠️ {e}")
+                response = jsonify({'error': 'Analysis queue is full, please retry shortly'})
+                response.headers['Retry-After'] = '5'
+                return response, 503
+        
+        print(f"📥 Queued analysis job {job.id}")
+        payload = dict(job_links(job.id), status=job.status)
+        return jsonify(payload), 202, {'Location': payload['status_url']}
+        
+    except Exception as e:
+        print(f"❌ Analysis job error: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
+
+def job_status_payload(job) -> dict:
+    payload = dict(job.to_dict(), **job_links(job.id))
+    if job.status == 'done':
+        payload['result'] = json.loads(job.result)
+    return payload
+
+@app.route('/api/analyze/jobs/<job_id>', methods=['GET'])
+def get_analysis_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(job_status_payload(job))
+
+@app.route('/api/analyze/jobs/<job_id>/events', methods=['GET'])
+def stream_analysis_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    def events():
+        seen_version = -1
+        while True:
+            if job.version > seen_version:
+                seen_version = job.version
+                if job.done:
+                    event = 'result' if job.status == 'done' else 'error'
+                    yield f"event: {event}\ndata: {json.dumps(job_status_payload(job))}\n\n"
+                    return
+                yield f"event: progress\ndata: {json.dumps(job.to_dict())}\n\n"
+            elif not job_queue.wait(job, seen_version, timeout=15):
+                # Comment line keeps proxies from closing an idle stream
+                yield ": keep-alive\n\n"
+    
+    return app.response_class(events(), mimetype='text/event-stream',
+                              headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def recommendation_etag(analysis_id: str, catalog_version: int, max_per_category) -> str:
+    digest = hashlib.sha1(f"{analysis_id}:{max_per_category}".encode('utf-8')).hexdigest()[:16]
+    return f"rec-{catalog_version}-{digest}"
+
+def cacheable(response, etag: str):
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={RECOMMENDATION_MAX_AGE}'
+    return response
+
+def ranked_products(issues, max_per_category, catalog_version: int) -> bytes:
+    """
+    JSON members (products, scores, confidence_score) of the top 3 ranking,
+    from the cache when the same issue signature was ranked before.
+    """
+    global recommendation_cache_version
+    if catalog_version != recommendation_cache_version:
+        # Products changed: every cached ranking is stale
+        recommendation_cache.clear()
+        recommendation_cache_version = catalog_version
+    
+    signature, weights = Recommender.signature(issues)
+    key = f"{catalog_version}:{max_per_category}:{signature}"
+    ranking = recommendation_cache.get(key)
+    if ranking is None:
+        recommendation = recommender.recommend(weights.items(), k=3, max_per_category=max_per_category)
+        ranking = (f'"products":{dumps(recommendation.products)},'
+                   f'"scores":{dumps(recommendation.scores)},'
+                   f'"confidence_score":{dumps(recommendation.confidence)}').encode('utf-8')
+        if recommendation.version == catalog_version:
+            recommendation_cache.put(key, ranking)
+    return ranking
+
 @app.route('/api/recommendations/<analysis_id>', methods=['GET'])
 def get_recommendations(analysis_id):
     try:
@@ -156,7 +416,7 @@ def get_recommendations(analysis_id):
         if analysis_id == 'sample' or analysis_id.startswith('mock-analysis-'):
             print("📝 Using demo/mock recommendations")
             # Get all products for demo
-            products = db.get_all_products()[:3]
+            products = catalog.all_products()[:3]
             
             result = {
                 'products': products,
@@ -165,12 +425,27 @@ def get_recommendations(analysis_id):
             }
             return jsonify(result)
         
-        # Get analysis from database
-        analysis = db.get_analysis(analysis_id)
-        if not analysis:
+        max_per_category = request.args.get('max_per_category', type=int)
+        if max_per_category is None:
+            max_per_category = recommender.max_per_category
+        elif max_per_category < 0:
+            return jsonify({'error': 'max_per_category must be 0 (no limit) or positive'}), 400
+        else:
+            max_per_category = max_per_category or None
+        
+        # An analysis never changes, so the response only changes with the
+        # catalog; revalidation needs no database access
+        version = catalog.version
+        etag = recommendation_etag(analysis_id, version, max_per_category)
+        if request.if_none_match.contains(etag):
+            return cacheable(app.response_class(status=304), etag)
+        
+        # Only issue types and confidences are needed, not the full analysis
+        issues = db.get_issue_confidences(analysis_id)
+        if issues is None:
             print(f"⚠️ Analysis not found: {analysis_id}, using default products")
             # Return default products instead of error
-            products = db.get_all_products()[:3]
+            products = catalog.all_products()[:3]
             
             result = {
                 'products': products,
@@ -180,27 +455,14 @@ def get_recommendations(analysis_id):
             return jsonify(result)
         
         # Get recommended products based on detected issues
-        issue_types = [issue['type'] for issue in analysis.get('issues', [])]
-        print(f"🎯 Targeting issues: {issue_types}")
+        print(f"🎯 Targeting issues: {[issue_type for issue_type, _ in issues]}")
         
-        products = db.get_products_for_issues(issue_types)
+        # Top 3 products, padded with the best rated others if fewer match
+        ranking = ranked_products(issues, max_per_category, version)
+        body = b'{"analysis_id":' + dumps(analysis_id).encode('utf-8') + b',' + ranking + b'}'
         
-        # Ensure we have at least 3 products
-        if len(products) < 3:
-            all_products = db.get_all_products()
-            products.extend(all_products[:3 - len(products)])
-        
-        # Limit to top 3 products
-        top_products = products[:3]
-        
-        result = {
-            'products': top_products,
-            'analysis_id': analysis_id,
-            'confidence_score': 0.85
-        }
-        
-        print(f"✅ Returning {len(top_products)} product recommendations")
-        return jsonify(result)
+        print("✅ Returning product recommendations")
+        return cacheable(app.response_class(body, mimetype='application/json'), etag)
         
     except Exception as e:
         print(f"❌ Recommendations error: {str(e)}")
@@ -219,11 +481,32 @@ def get_recommendations(analysis_id):
         except:
             return jsonify({'error': 'Failed to get recommendations'}), 500
 
+def send_body(body: EncodedBody):
+    """
+    Send a pre-serialized JSON body: 304 when the client already has this
+    version, otherwise the best compressed variant the client accepts.
+    Clients must revalidate, which costs them a 304 at most.
+    """
+    if request.if_none_match.contains_weak(body.etag):
+        response = app.response_class(status=304)
+    else:
+        encoding = negotiate_encoding(request.accept_encodings) if body.compresses() else None
+        response = app.response_class(body.encoded(encoding), mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    # Weak: the compressed variants all carry the same ETag
+    response.set_etag(body.etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+    return response
+
 @app.route('/api/products', methods=['GET'])
 def get_all_products():
     try:
-        products = db.get_all_products()
-        return jsonify(products)
+        snapshot = catalog.snapshot()
+        body = products_body.get(snapshot.version, str(snapshot.version),
+                                 lambda: dumps(snapshot.products).encode('utf-8'))
+        return send_body(body)
     except Exception as e:
         print(f"Products error: {str(e)}")
         return jsonify({'error': 'Failed to get products'}), 500
@@ -231,16 +514,91 @@ def get_all_products():
 @app.route('/api/analyses/recent', methods=['GET'])
 def get_recent_analyses():
     try:
-        analyses = db.get_recent_analyses(limit=10)
-        return jsonify(analyses)
+        # Read the version before the rows, so a concurrent save can only
+        # make the body newer than its ETag, never older
+        version = db.get_analyses_version()
+        etag_suffix = str(version[0])
+        if len(version) > 1:
+            pending = ','.join(version[1:]).encode('utf-8')
+            etag_suffix += '-' + hashlib.sha1(pending).hexdigest()[:12]
+        body = recent_analyses_body.get(version, etag_suffix,
+                                        lambda: dumps(db.get_recent_analyses(limit=10)).encode('utf-8'))
+        return send_body(body)
     except Exception as e:
         print(f"Recent analyses error: {str(e)}")
         return jsonify({'error': 'Failed to get recent analyses'}), 500
 
+def encode_cursor(analysis: dict) -> str:
+    """Opaque page cursor pointing just past ``analysis``"""
+    key = json.dumps([analysis['timestamp'], analysis['id']], separators=(',', ':'))
+    return base64.urlsafe_b64encode(key.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str):
+    padded = cursor + '=' * (-len(cursor) % 4)
+    timestamp, analysis_id = json.loads(base64.urlsafe_b64decode(padded))
+    return str(timestamp), str(analysis_id)
+
+def parse_timestamp(value: str) -> str:
+    """Normalize an ISO 8601 query parameter to the stored timestamp format"""
+    return datetime.fromisoformat(value).isoformat()
+
+# Largest page /api/analyses returns
+HISTORY_MAX_LIMIT = 100
+
+@app.route('/api/analyses', methods=['GET'])
+def get_analysis_history():
+    """
+    Paginated analysis history, newest first.
+    Query parameters: limit, cursor (from next_cursor), since, until
+    (ISO 8601) and fields (comma separated, e.g. id,timestamp,severity,issue_count).
+    """
+    try:
+        limit = min(int(request.args.get('limit', 20)), HISTORY_MAX_LIMIT)
+        if limit < 1:
+            raise ValueError("limit must be positive")
+        cursor = request.args.get('cursor')
+        before = decode_cursor(cursor) if cursor else None
+        since = parse_timestamp(request.args['since']) if 'since' in request.args else None
+        until = parse_timestamp(request.args['until']) if 'until' in request.args else None
+        fields = request.args.get('fields')
+        fields = [field.strip() for field in fields.split(',') if field.strip()] if fields else DEFAULT_HISTORY_FIELDS
+        # The cursor is built from these, so always return them
+        fields = list(dict.fromkeys(['id', 'timestamp', *fields]))
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': f'Invalid query: {e}'}), 400
+    
+    try:
+        analyses = db.get_analysis_history(limit=limit, before=before, since=since, until=until, fields=fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"❌ Analysis history error: {str(e)}")
+        return jsonify({'error': 'Failed to get analysis history'}), 500
+    
+    next_cursor = encode_cursor(analyses[-1]) if len(analyses) == limit else None
+    return jsonify({'analyses': analyses, 'next_cursor': next_cursor})
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    return jsonify({
+        'timing_enabled': timing.is_enabled(),
+        'stages': timing.registry.snapshot(),
+        'result_cache': result_cache.stats(),
+        'jobs': job_queue.stats(),
+        'admission': admission.stats(),
+        'analysis_writer': db.writer.stats() if db.writer is not None else None,
+        'catalog': catalog.stats(),
+        'recommendation_cache': recommendation_cache.stats(),
+        'response_bodies': {
+            'products': products_body.stats(),
+            'recent_analyses': recent_analyses_body.stats()
+        }
+    })
+
 if __name__ == '__main__':
     try:
         # Initialize database
@@ -253,10 +611,14 @@ if __name__ == '__main__':
         print("\n📡 API endpoints:")
         print("- GET  /api/health - Health check")
         print("- POST /api/analyze - Analyze skin from image")
+        print("- POST /api/analyze/jobs - Queue an analysis (poll /api/analyze/jobs/<id> or stream .../events)")
         print("- GET  /api/recommendations/<analysis_id> - Get product recommendations")
         print("- GET  /api/products - Get all products")
         print("- GET  /api/analyses/recent - Get recent analyses")
+        print("- GET  /api/analyses - Paginated analysis history (cursor, since, until, fields)")
+        print("- GET  /api/metrics - Pipeline timing histograms (BOOTS_TIMING=1)")
         print("\n✨ Ready to accept requests!")
+        print("💡 Development server; use serve.py to run multiple workers in production")
         
         app.run(debug=True, host='0.0.0.0', port=5000)
     except Exception as e:
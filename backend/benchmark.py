@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Boots Skin Care - Analyzer Benchmarks
+Times the skin detectors, face detection, full analysis and /api/analyze
+on deterministic fixture images, and compares against a saved baseline.
+
+    python benchmark.py                          # run and print
+    python benchmark.py --output results.json    # also save results
+    python benchmark.py --baseline base.json     # flag regressions
+"""
+
+import argparse
+import base64
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import cv2
+import numpy as np
+
+import fixtures
+from skin_analyzer_opencv import DETECTORS, OpenCVSkinAnalyzer, PreparedRegion
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def measure(func: Callable[[], object], iterations: int, warmup: int, min_time: float) -> Dict:
+    """Run ``func`` repeatedly and summarise its latency in milliseconds"""
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < iterations or time.perf_counter() - started < min_time:
+        call_started = time.perf_counter()
+        func()
+        latencies.append((time.perf_counter() - call_started) * 1000)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'iterations': len(latencies),
+        'throughput_per_s': round(len(latencies) / elapsed, 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3)
+    }
+
+
+def benchmark_cases(corpus: Dict, include_api: bool):
+    """Yield (case name, callable) for every benchmark in the suite"""
+    # Face detection always runs the real cascade
+    cascade = OpenCVSkinAnalyzer(parallelism=1)
+
+    for key, (image, boxes) in corpus.items():
+        if boxes is None:
+            # Real photo: analyze whatever faces the cascade finds
+            analyzer = cascade
+            boxes = cascade._detect_faces(image)
+        else:
+            analyzer = fixtures.FixedFaceAnalyzer(boxes, parallelism=1)
+
+        yield f"detect_faces@{key}", lambda image=image: cascade._detect_faces(image)
+        yield f"detect_skin_issues@{key}", lambda image=image, analyzer=analyzer: analyzer.detect_skin_issues(image)
+
+        # Detectors run on the first face only; a fresh PreparedRegion each
+        # call so colour conversion is part of the measurement
+        if boxes:
+            x, y, w, h = boxes[0]
+            crop = image[y:y+h, x:x+w]
+            for name in DETECTORS:
+                method = getattr(analyzer, name)
+                yield (f"{name.lstrip('_')}@{key}",
+                       lambda method=method, crop=crop, x=x, y=y: method(PreparedRegion(crop), x, y))
+
+        if include_api:
+            yield f"api_analyze@{key}", _api_call(image, analyzer)
+
+
+def _api_call(image: np.ndarray, analyzer) -> Callable[[], object]:
+    """POST the image to /api/analyze through the Flask test client"""
+    import app as app_module
+    from database import Database
+
+    if not hasattr(_api_call, 'db'):
+        path = os.path.join(tempfile.mkdtemp(prefix='boots-bench-'), 'bench.db')
+        _api_call.db = Database(path)
+        _api_call.db.initialize_database()
+    app_module.db = _api_call.db
+
+    _, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    payload = {'image': 'data:image/jpeg;base64,' + base64.b64encode(encoded.tobytes()).decode()}
+    client = app_module.app.test_client()
+
+    def call():
+        # The fixture's analyzer keeps the face count fixed
+        app_module.skin_analyzer = analyzer
+        # Same payload every call; time the full pipeline, not a cache hit
+        app_module.result_cache.clear()
+        response = client.post('/api/analyze', json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/analyze returned {response.status_code}")
+    return call
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Return a line per case whose p50 got slower than the baseline by more than ``tolerance``"""
+    regressions = []
+    for name, current in results['results'].items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous or not previous['p50_ms']:
+            continue
+        ratio = current['p50_ms'] / previous['p50_ms']
+        if ratio > 1 + tolerance:
+            regressions.append(f"{name}: p50 {previous['p50_ms']:.2f}ms -> {current['p50_ms']:.2f}ms "
+                               f"({(ratio - 1) * 100:+.0f}%)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20, help='minimum timed calls per case')
+    parser.add_argument('--warmup', type=int, default=2, help='untimed calls per case')
+    parser.add_argument('--min-time', type=float, default=0.5, help='minimum seconds per case')
+    parser.add_argument('--images', help='directory of real photos to use instead of fixtures')
+    parser.add_argument('--filter', help='only run cases whose name contains this text')
+    parser.add_argument('--no-api', action='store_true', help='skip the /api/analyze cases')
+    parser.add_argument('--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='compare against results saved with --output')
+    parser.add_argument('--tolerance', type=float, default=0.10, help='allowed p50 slowdown (0.10 = 10%%)')
+    args = parser.parse_args()
+
+    # Instrumentation would skew the numbers
+    os.environ['BOOTS_TIMING'] = '0'
+
+    corpus = fixtures.load_image_dir(args.images) if args.images else fixtures.default_corpus()
+
+    results = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'opencv': cv2.__version__,
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'cpu_count': os.cpu_count()
+        },
+        'results': {}
+    }
+
+    print(f"{'case':<52} {'n':>5} {'ops/s':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, func in benchmark_cases(corpus, include_api=not args.no_api):
+        if args.filter and args.filter not in name:
+            continue
+        stats = measure(func, args.iterations, args.warmup, args.min_time)
+        results['results'][name] = stats
+        print(f"{name:<52} {stats['iterations']:>5} {stats['throughput_per_s']:>9.1f} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results saved to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  - {line}")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
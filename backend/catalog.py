@@ -0,0 +1,85 @@
+"""
+In-memory product catalog for recommendations.
+
+Products are loaded once into rating order together with an inverted index
+from skin issue type to the products that target it, so ranking products
+for a set of issues touches only the matching products and never SQLite.
+Triggers on the products table bump a version number in catalog_meta; the
+catalog polls that number (at most every ``check_interval`` seconds) and
+reloads when it changes, including changes made by other processes.
+"""
+
+import threading
+import time
+from typing import Dict, List
+
+from database import Database
+
+
+class CatalogSnapshot:
+    """Immutable view of the products table at one catalog version"""
+
+    def __init__(self, version: int, products: List[Dict]):
+        self.version = version
+        self.products = products  # rating order, as returned by the database
+        self.by_id = {product['id']: product for product in products}
+
+        # issue type -> positions of the products targeting it, in rating order
+        self.index = {}
+        for position, product in enumerate(products):
+            for issue_type in set(product['target_issues']):
+                self.index.setdefault(issue_type, []).append(position)
+
+
+class ProductCatalog:
+    """Products and issue index cached in memory, reloaded when the table changes"""
+
+    def __init__(self, db: Database, check_interval: float = 1.0):
+        self.db = db
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self.reloads = 0
+
+    def snapshot(self) -> CatalogSnapshot:
+        """Current snapshot, reloading first if the products table changed"""
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+            return snapshot
+
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._snapshot
+            version = self.db.get_catalog_version()
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = CatalogSnapshot(version, self.db.get_all_products())
+                self.reloads += 1
+                print(f"✅ Product catalog loaded: {len(self._snapshot.products)} products (version {version})")
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self):
+        """Check the version on the next access instead of waiting for the interval"""
+        self._checked_at = 0.0
+
+    @property
+    def version(self) -> int:
+        return self.snapshot().version
+
+    def all_products(self) -> List[Dict]:
+        """Every product, highest rated first"""
+        return self.snapshot().products
+
+    def get(self, product_id: str) -> Dict:
+        return self.snapshot().by_id.get(product_id)
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version if snapshot else None,
+            'products': len(snapshot.products) if snapshot else 0,
+            'issue_types': len(snapshot.index) if snapshot else 0,
+            'reloads': self.reloads,
+            'check_interval_seconds': self.check_interval
+        }
@@ -1,27 +1,366 @@
 import sqlite3
 import json
+import os
+import threading
+import time
+import atexit
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
+from issues import as_issue
+
+# Applied to every new connection. WAL lets readers run alongside a writer,
+# and synchronous=NORMAL is durable across crashes of the app in WAL mode.
+CONNECTION_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA cache_size=-8000',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA busy_timeout=5000',
+)
+
+# sqlite3 keeps this many compiled statements per connection; the queries
+# below are constant strings so each is prepared once per connection
+STATEMENT_CACHE_SIZE = 128
+
+# Bumped (via PRAGMA user_version) whenever initialize_database migrates
+# the schema; 2 moved issues out of the analyses.issues JSON column
+SCHEMA_VERSION = 2
+
+INSERT_ANALYSIS_SQL = '''
+    INSERT INTO analyses (id, timestamp, recommendations, severity)
+    VALUES (?, ?, ?, ?)
+'''
+
+INSERT_ISSUE_SQL = '''
+    INSERT INTO analysis_issues (analysis_id, position, issue_id, type, confidence, x, y, width, height)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# Same column order as INSERT_ISSUE_SQL
+ISSUE_COLUMNS = 'analysis_id, position, issue_id, type, confidence, x, y, width, height'
+
+# An analysis row plus the rows of its issues, as written in one go
+AnalysisRecord = Tuple[tuple, List[tuple]]
+
+# Fields get_analysis_history can return; only issues and issue_count read
+# analysis_issues, so list views that skip them touch just the analyses index
+HISTORY_FIELDS = ('id', 'timestamp', 'severity', 'recommendations', 'issues', 'issue_count')
+DEFAULT_HISTORY_FIELDS = ('id', 'timestamp', 'issues', 'recommendations', 'severity')
+
+# Positions of the plain fields in an analyses row
+ANALYSIS_COLUMNS = {'id': 0, 'timestamp': 1, 'severity': 3}
+
+
+class ConnectionPool:
+    """
+    Persistent SQLite connections shared by the threads of one process.
+    
+    Threads borrow a connection for the duration of a ``with`` block and
+    hand it back afterwards; up to ``max_idle`` are kept open between uses.
+    Connections inherited across fork() are never reused or closed, so
+    pre-forked workers each open their own.
+    """
+    
+    def __init__(self, db_path: str, max_idle: int = 8):
+        self.db_path = db_path
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._inherited = []
+        self.opened = 0
+    
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5.0, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE_SIZE)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        self.opened += 1
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a connection; an exception rolls back its open transaction"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked: the parent's connections must not be touched here
+                self._inherited.extend(self._idle)
+                self._idle = []
+                self._pid = os.getpid()
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            with self._lock:
+                keep = len(self._idle) < self.max_idle and self._pid == os.getpid()
+                if keep:
+                    self._idle.append(conn)
+            if not keep:
+                conn.close()
+    
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class WriteQueueFullError(Exception):
+    """The write-behind queue stayed full for longer than the submit timeout"""
+
+
+class AnalysisWriter:
+    """
+    Write-behind queue for analysis records.
+    
+    A background thread commits queued records in one transaction per
+    batch, as soon as ``batch_size`` are waiting or ``interval`` seconds
+    after the first one arrived. Records stay readable through ``get``
+    until they are committed. When ``max_pending`` are uncommitted,
+    ``submit`` blocks until the writer catches up, for at most
+    ``submit_timeout`` seconds.
+    """
+    
+    def __init__(self, pool: ConnectionPool, max_pending: int = 1000, batch_size: int = 100,
+                 interval: float = 0.05, submit_timeout: float = 5.0):
+        self.pool = pool
+        self.max_pending = max(1, max_pending)
+        self.batch_size = max(1, batch_size)
+        self.interval = interval
+        self.submit_timeout = submit_timeout
+        self._pending = OrderedDict()  # id -> row, until committed
+        self._queue = deque()
+        self._changed = threading.Condition()
+        self._thread = None
+        self._pid = None
+        self._flush_requested = False
+        self._closed = False
+        self.batches = 0
+        self.written = 0
+        self.failures = 0
+        self.rejected = 0
+    
+    def _ensure_thread(self):
+        """Start the writer thread (again, in a forked child); lock held"""
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='analysis-writer', daemon=True)
+            self._thread.start()
+    
+    def submit(self, record: AnalysisRecord):
+        with self._changed:
+            if self._closed:
+                raise RuntimeError("Analysis writer is closed")
+            self._ensure_thread()
+            # Commits may be failing (disk full, locked database); don't
+            # hold the caller forever
+            if not self._changed.wait_for(lambda: len(self._pending) < self.max_pending,
+                                          self.submit_timeout):
+                self.rejected += 1
+                raise WriteQueueFullError(
+                    f"{len(self._pending)} analyses still uncommitted after {self.submit_timeout}s")
+            self._pending[record[0][0]] = record
+            self._queue.append(record)
+            self._changed.notify_all()
+    
+    def get(self, analysis_id: str) -> Optional[AnalysisRecord]:
+        with self._changed:
+            return self._pending.get(analysis_id)
+    
+    def pending_records(self) -> List[AnalysisRecord]:
+        with self._changed:
+            return list(self._pending.values())
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Commit everything queued so far; False if ``timeout`` ran out first"""
+        with self._changed:
+            if not self._pending:
+                return True
+            self._flush_requested = True
+            self._changed.notify_all()
+            return self._changed.wait_for(lambda: not self._pending, timeout)
+    
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Flush and stop the writer thread; False if records were left uncommitted"""
+        with self._changed:
+            if self._closed:
+                return not self._pending
+        flushed = self.flush(timeout)
+        with self._changed:
+            self._closed = True
+            self._changed.notify_all()
+            pending = len(self._pending)
+            thread = self._thread if self._pid == os.getpid() else None
+        if not flushed:
+            # The writer may be retrying a failing commit forever; don't wait on it
+            print(f"⚠️ Analysis writer gave up after {timeout}s with {pending} analyses uncommitted")
+            return False
+        if thread is not None:
+            thread.join(timeout)
+        return True
+    
+    def stats(self) -> Dict:
+        with self._changed:
+            return {
+                'pending': len(self._pending),
+                'max_pending': self.max_pending,
+                'batch_size': self.batch_size,
+                'interval_seconds': self.interval,
+                'batches': self.batches,
+                'written': self.written,
+                'failures': self.failures,
+                'rejected': self.rejected
+            }
+    
+    def _next_batch(self) -> List[AnalysisRecord]:
+        with self._changed:
+            self._changed.wait_for(lambda: self._queue or self._closed)
+            if not self._queue:
+                return []
+            # Give a batch up to ``interval`` to fill unless a flush is waiting
+            deadline = time.monotonic() + self.interval
+            while (len(self._queue) < self.batch_size and not self._flush_requested
+                   and not self._closed):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            count = min(self.batch_size, len(self._queue))
+            return [self._queue.popleft() for _ in range(count)]
+    
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            try:
+                self._write(batch)
+            except Exception as e:
+                with self._changed:
+                    self.failures += 1
+                    self._queue.extendleft(reversed(batch))
+                    if self._closed:
+                        # close() has given up on these; stop retrying
+                        print(f"⚠️ Analysis write failed after close, stopping: {e}")
+                        return
+                print(f"⚠️ Analysis write failed, retrying: {e}")
+                time.sleep(max(self.interval, 0.5))
+                continue
+            
+            with self._changed:
+                for record in batch:
+                    self._pending.pop(record[0][0], None)
+                self.batches += 1
+                self.written += len(batch)
+                if not self._queue:
+                    self._flush_requested = False
+                self._changed.notify_all()
+    
+    def _write(self, batch: List[AnalysisRecord]):
+        with self.pool.connection() as conn:
+            try:
+                conn.executemany(INSERT_ANALYSIS_SQL, [analysis_row for analysis_row, _ in batch])
+                conn.executemany(INSERT_ISSUE_SQL, [row for _, issue_rows in batch for row in issue_rows])
+                conn.commit()
+            except sqlite3.IntegrityError:
+                # Keep one bad record from blocking the rest of the batch
+                conn.rollback()
+                for analysis_row, issue_rows in batch:
+                    try:
+                        conn.execute('SAVEPOINT record')
+                        conn.execute(INSERT_ANALYSIS_SQL, analysis_row)
+                        conn.executemany(INSERT_ISSUE_SQL, issue_rows)
+                        conn.execute('RELEASE record')
+                    except sqlite3.IntegrityError as e:
+                        conn.execute('ROLLBACK TO record')
+                        conn.execute('RELEASE record')
+                        print(f"⚠️ Dropping analysis {analysis_row[0]}: {e}")
+                conn.commit()
+
 
 class Database:
-    def __init__(self, db_path: str = 'boots_skincare.db'):
+    def __init__(self, db_path: str = 'boots_skincare.db', pool_size: Optional[int] = None,
+                 write_behind: Optional[bool] = None):
         self.db_path = db_path
+        if pool_size is None:
+            pool_size = int(os.environ.get('DB_POOL_SIZE', 8))
+        self.pool = ConnectionPool(db_path, max_idle=pool_size)
+        
+        # Optionally queue analysis saves and commit them in batches
+        if write_behind is None:
+            write_behind = os.environ.get('DB_WRITE_BEHIND', '0') == '1'
+        self.writer = None
+        if write_behind:
+            self.writer = AnalysisWriter(
+                self.pool,
+                max_pending=int(os.environ.get('DB_WRITE_QUEUE', 1000)),
+                batch_size=int(os.environ.get('DB_WRITE_BATCH', 100)),
+                interval=float(os.environ.get('DB_WRITE_INTERVAL', 0.05)),
+                submit_timeout=float(os.environ.get('DB_WRITE_SUBMIT_TIMEOUT', 5))
+            )
+            atexit.register(self.close)
+        
+        # Seconds close() waits for queued analyses to commit
+        self.close_timeout = float(os.environ.get('DB_WRITE_CLOSE_TIMEOUT', 30))
+    
+    def close(self, timeout: Optional[float] = None):
+        """Commit queued analyses (waiting at most ``timeout`` seconds) and close pooled connections"""
+        if self.writer is not None:
+            self.writer.close(self.close_timeout if timeout is None else timeout)
+        self.pool.close()
     
     def initialize_database(self):
         """Initialize the database with tables and sample data"""
-        conn = sqlite3.connect(self.db_path)
+        with self.pool.connection() as conn:
+            self._create_schema(conn)
+    
+    def _create_schema(self, conn: sqlite3.Connection):
         cursor = conn.cursor()
         
+        # Databases from before schema version 2 keep issues as JSON
+        columns = [row[1] for row in cursor.execute('PRAGMA table_info(analyses)')]
+        if 'issues' in columns:
+            self._migrate_issue_blobs(conn)
+        
         # Create analyses table
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS analyses (
                 id TEXT PRIMARY KEY,
                 timestamp TEXT NOT NULL,
-                issues TEXT NOT NULL,
                 recommendations TEXT,
                 severity TEXT NOT NULL
             )
         ''')
+        # Newest-first paging by (timestamp, id) reads straight off this index
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_analyses_timestamp_id ON analyses (timestamp, id)')
+        cursor.execute('DROP INDEX IF EXISTS idx_analyses_timestamp')
+        
+        # One row per detected issue, in detection order
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analysis_issues (
+                analysis_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                issue_id TEXT NOT NULL,
+                type TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                x INTEGER NOT NULL,
+                y INTEGER NOT NULL,
+                width INTEGER NOT NULL,
+                height INTEGER NOT NULL,
+                PRIMARY KEY (analysis_id, position)
+            ) WITHOUT ROWID
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_issues_type ON analysis_issues (type)')
+        cursor.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
         
         # Create products table
         cursor.execute('''
@@ -38,13 +377,124 @@ class Database:
             )
         ''')
         
+        # Every change to products bumps products_version, so in-memory
+        # catalogs (in any process) know when to reload
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS catalog_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            )
+        ''')
+        cursor.execute("INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('products_version', 0)")
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS products_version_{event.lower()}
+                AFTER {event} ON products
+                BEGIN
+                    UPDATE catalog_meta SET value = value + 1 WHERE key = 'products_version';
+                END
+            ''')
+        
+        # Same for analyses, so cached history responses know when to rebuild
+        cursor.execute("INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('analyses_version', 0)")
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS analyses_version_{event.lower()}
+                AFTER {event} ON analyses
+                BEGIN
+                    UPDATE catalog_meta SET value = value + 1 WHERE key = 'analyses_version';
+                END
+            ''')
+        
+        # Content hash of each product as of its last bulk import
+        # (product_import.py), used to skip unchanged rows
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS product_hashes (
+                id TEXT PRIMARY KEY,
+                hash TEXT NOT NULL
+            ) WITHOUT ROWID
+        ''')
+        
         # Insert sample products if table is empty
         cursor.execute('SELECT COUNT(*) FROM products')
         if cursor.fetchone()[0] == 0:
             self._insert_sample_products(cursor)
         
         conn.commit()
-        conn.close()
+    
+    def _migrate_issue_blobs(self, conn: sqlite3.Connection):
+        """
+        Move analyses.issues JSON into analysis_issues rows and drop the column.
+        Blobs that cannot be parsed are kept verbatim in analysis_issues_unreadable.
+        """
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Another process may have migrated while we waited for the lock
+            columns = [row[1] for row in conn.execute('PRAGMA table_info(analyses)')]
+            if 'issues' not in columns:
+                conn.rollback()
+                return
+            
+            print("🔄 Migrating stored analyses to the analysis_issues table...")
+            conn.execute('''
+                CREATE TABLE analyses_v2 (
+                    id TEXT PRIMARY KEY,
+                    timestamp TEXT NOT NULL,
+                    recommendations TEXT,
+                    severity TEXT NOT NULL
+                )
+            ''')
+            conn.execute('''
+                INSERT INTO analyses_v2 (id, timestamp, recommendations, severity)
+                SELECT id, timestamp, recommendations, severity FROM analyses
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS analysis_issues (
+                    analysis_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    issue_id TEXT NOT NULL,
+                    type TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    x INTEGER NOT NULL,
+                    y INTEGER NOT NULL,
+                    width INTEGER NOT NULL,
+                    height INTEGER NOT NULL,
+                    PRIMARY KEY (analysis_id, position)
+                ) WITHOUT ROWID
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS analysis_issues_unreadable (
+                    analysis_id TEXT PRIMARY KEY,
+                    issues TEXT,
+                    error TEXT NOT NULL
+                )
+            ''')
+            
+            migrated = skipped = 0
+            for analysis_id, issues_json in conn.execute('SELECT id, issues FROM analyses').fetchall():
+                try:
+                    issues = [as_issue(issue) for issue in json.loads(issues_json)]
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"⚠️ Keeping unreadable issues of analysis {analysis_id} "
+                          f"in analysis_issues_unreadable: {e}")
+                    conn.execute(
+                        'INSERT OR REPLACE INTO analysis_issues_unreadable (analysis_id, issues, error) '
+                        'VALUES (?, ?, ?)',
+                        (analysis_id, issues_json, str(e))
+                    )
+                    skipped += 1
+                    continue
+                conn.executemany(INSERT_ISSUE_SQL, self._issue_rows(analysis_id, issues))
+                migrated += 1
+            
+            conn.execute('DROP TABLE analyses')
+            conn.execute('ALTER TABLE analyses_v2 RENAME TO analyses')
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            conn.commit()
+            print(f"✅ Migrated issues of {migrated} analyses ({skipped} unreadable kept aside)")
+        except Exception:
+            conn.rollback()
+            raise
     
     def _insert_sample_products(self, cursor):
         """Insert sample Boots skincare products"""
@@ -161,90 +611,220 @@ class Database:
             }
         ]
         
-        for product in sample_products:
-            cursor.execute('''
-                INSERT INTO products (id, name, description, price, image_url, category, target_issues, rating, brand)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+        cursor.executemany('''
+            INSERT INTO products (id, name, description, price, image_url, category, target_issues, rating, brand)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (
                 product['id'], product['name'], product['description'], product['price'],
                 product['image_url'], product['category'], product['target_issues'],
                 product['rating'], product['brand']
-            ))
+            )
+            for product in sample_products
+        ])
+    
+    @staticmethod
+    def _issue_rows(analysis_id: str, issues) -> List[tuple]:
+        return [
+            (analysis_id, position, issue.id, issue.type, float(issue.confidence),
+             issue.x, issue.y, issue.width, issue.height)
+            for position, issue in enumerate(issues)
+        ]
     
     def save_analysis(self, analysis: Dict):
-        """Save an analysis result to the database"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
-            INSERT INTO analyses (id, timestamp, issues, recommendations, severity)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (
+        """Save an analysis result and its issues"""
+        analysis_row = (
             analysis['id'],
             analysis['timestamp'],
-            json.dumps(analysis['issues']),
             json.dumps(analysis['recommendations']),
             analysis['severity']
-        ))
+        )
+        issue_rows = self._issue_rows(analysis['id'], [as_issue(issue) for issue in analysis['issues']])
         
-        conn.commit()
-        conn.close()
+        if self.writer is not None:
+            self.writer.submit((analysis_row, issue_rows))
+            return
+        
+        with self.pool.connection() as conn:
+            conn.execute(INSERT_ANALYSIS_SQL, analysis_row)
+            conn.executemany(INSERT_ISSUE_SQL, issue_rows)
+            conn.commit()
+    
+    @staticmethod
+    def _issue_dicts(issue_rows) -> List[Dict]:
+        return [
+            {
+                'id': issue[2],
+                'type': issue[3],
+                'confidence': issue[4],
+                'bbox': {'x': issue[5], 'y': issue[6], 'width': issue[7], 'height': issue[8]}
+            }
+            for issue in issue_rows
+        ]
+    
+    @classmethod
+    def _analysis_from_rows(cls, row, issue_rows, fields=DEFAULT_HISTORY_FIELDS) -> Dict:
+        analysis = {}
+        for field in fields:
+            if field == 'issues':
+                analysis['issues'] = cls._issue_dicts(issue_rows)
+            elif field == 'issue_count':
+                analysis['issue_count'] = len(issue_rows)
+            elif field == 'recommendations':
+                analysis['recommendations'] = json.loads(row[2]) if row[2] else []
+            else:
+                analysis[field] = row[ANALYSIS_COLUMNS[field]]
+        return analysis
     
     def get_analysis(self, analysis_id: str) -> Optional[Dict]:
-        """Get an analysis by ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        """Get an analysis by ID, including one still waiting to be written"""
+        record = self.writer.get(analysis_id) if self.writer is not None else None
+        if record is not None:
+            return self._analysis_from_rows(*record)
         
-        cursor.execute('SELECT * FROM analyses WHERE id = ?', (analysis_id,))
-        row = cursor.fetchone()
-        
-        conn.close()
+        with self.pool.connection() as conn:
+            row = conn.execute('SELECT * FROM analyses WHERE id = ?', (analysis_id,)).fetchone()
+            if row is None:
+                return None
+            issue_rows = conn.execute(
+                f'SELECT {ISSUE_COLUMNS} FROM analysis_issues WHERE analysis_id = ? ORDER BY position',
+                (analysis_id,)
+            ).fetchall()
+        return self._analysis_from_rows(row, issue_rows)
+    
+    def get_issue_confidences(self, analysis_id: str) -> Optional[List[Tuple[str, float]]]:
+        """(type, confidence) of each issue of an analysis; None if it doesn't exist"""
+        record = self.writer.get(analysis_id) if self.writer is not None else None
+        if record is not None:
+            return [(issue_row[3], issue_row[4]) for issue_row in record[1]]
         
-        if row:
-            return {
-                'id': row[0],
-                'timestamp': row[1],
-                'issues': json.loads(row[2]),
-                'recommendations': json.loads(row[3]) if row[3] else [],
-                'severity': row[4]
-            }
-        return None
+        with self.pool.connection() as conn:
+            rows = conn.execute('''
+                SELECT analyses.id, analysis_issues.type, analysis_issues.confidence
+                FROM analyses
+                LEFT JOIN analysis_issues ON analysis_issues.analysis_id = analyses.id
+                WHERE analyses.id = ?
+                ORDER BY analysis_issues.position
+            ''', (analysis_id,)).fetchall()
+        if not rows:
+            return None
+        return [(issue_type, confidence) for _, issue_type, confidence in rows if issue_type is not None]
     
     def get_recent_analyses(self, limit: int = 10) -> List[Dict]:
         """Get recent analyses"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        return self.get_analysis_history(limit=limit)
+    
+    def get_analysis_history(self, limit: int = 20, before: Optional[Tuple[str, str]] = None,
+                             since: Optional[str] = None, until: Optional[str] = None,
+                             fields=DEFAULT_HISTORY_FIELDS) -> List[Dict]:
+        """
+        Analyses newest first, at most ``limit`` of them.
         
-        cursor.execute('''
-            SELECT * FROM analyses 
-            ORDER BY timestamp DESC 
-            LIMIT ?
-        ''', (limit,))
+        ``before`` is the (timestamp, id) of the last analysis on the previous
+        page; ``since`` (inclusive) and ``until`` (exclusive) bound the
+        timestamps. Each page is a range scan of the (timestamp, id) index,
+        so its cost does not grow with the size of the history.
+        """
+        unknown = set(fields) - set(HISTORY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
         
-        rows = cursor.fetchall()
-        conn.close()
+        conditions, params = [], []
+        if before is not None:
+            conditions.append('(timestamp, id) < (?, ?)')
+            params.extend(before)
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            conditions.append('timestamp < ?')
+            params.append(until)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
         
-        analyses = []
-        for row in rows:
-            analyses.append({
-                'id': row[0],
-                'timestamp': row[1],
-                'issues': json.loads(row[2]),
-                'recommendations': json.loads(row[3]) if row[3] else [],
-                'severity': row[4]
-            })
+        read_issues = 'issues' in fields or 'issue_count' in fields
+        with self.pool.connection() as conn:
+            rows = conn.execute(f'''
+                SELECT id, timestamp, recommendations, severity FROM analyses
+                {where}
+                ORDER BY timestamp DESC, id DESC
+                LIMIT ?
+            ''', params + [limit]).fetchall()
+            if not read_issues:
+                records = [(row, []) for row in rows]
+            elif 'issues' in fields:
+                records = self._with_issues(conn, rows)
+            else:
+                records = self._with_issue_counts(conn, rows)
+        
+        if self.writer is not None:
+            pending = [
+                record for record in self.writer.pending_records()
+                if (before is None or (record[0][1], record[0][0]) < tuple(before))
+                and (since is None or record[0][1] >= since)
+                and (until is None or record[0][1] < until)
+            ]
+            if pending:
+                # A record committed in the meantime may appear twice, so
+                # keep the first copy of each ID
+                merged = sorted(pending + records, key=lambda record: (record[0][1], record[0][0]),
+                                reverse=True)
+                seen = set()
+                records = [record for record in merged
+                           if not (record[0][0] in seen or seen.add(record[0][0]))][:limit]
         
-        return analyses
+        return [self._analysis_from_rows(row, issue_rows, fields) for row, issue_rows in records]
+    
+    @staticmethod
+    def _with_issues(conn: sqlite3.Connection, rows: List[tuple]) -> List[AnalysisRecord]:
+        """Pair analysis rows with their issue rows using one query"""
+        if not rows:
+            return []
+        issues = {row[0]: [] for row in rows}
+        placeholders = ','.join('?' * len(rows))
+        for issue_row in conn.execute(
+                f'SELECT {ISSUE_COLUMNS} FROM analysis_issues '
+                f'WHERE analysis_id IN ({placeholders}) ORDER BY analysis_id, position',
+                list(issues)):
+            issues[issue_row[0]].append(issue_row)
+        return [(row, issues[row[0]]) for row in rows]
+    
+    @staticmethod
+    def _with_issue_counts(conn: sqlite3.Connection, rows: List[tuple]) -> List[AnalysisRecord]:
+        """Like _with_issues, but only the number of issues is read (as placeholder rows)"""
+        if not rows:
+            return []
+        placeholders = ','.join('?' * len(rows))
+        counts = dict(conn.execute(
+            f'SELECT analysis_id, COUNT(*) FROM analysis_issues '
+            f'WHERE analysis_id IN ({placeholders}) GROUP BY analysis_id',
+            [row[0] for row in rows]
+        ).fetchall())
+        return [(row, [None] * counts.get(row[0], 0)) for row in rows]
+    
+    def _meta_value(self, key: str) -> int:
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+    
+    def get_catalog_version(self) -> int:
+        """Counter bumped by every insert, update or delete on products"""
+        return self._meta_value('products_version')
+    
+    def get_analyses_version(self) -> Tuple:
+        """
+        Changes whenever the analyses returned by get_analysis_history may
+        have: the committed-change counter plus the ids still queued for
+        write-behind in this process.
+        """
+        version = self._meta_value('analyses_version')
+        if self.writer is None:
+            return (version,)
+        return (version, *(record[0][0] for record in self.writer.pending_records()))
     
     def get_all_products(self) -> List[Dict]:
         """Get all products"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT * FROM products ORDER BY rating DESC')
-        rows = cursor.fetchall()
-        
-        conn.close()
+        with self.pool.connection() as conn:
+            rows = conn.execute('SELECT * FROM products ORDER BY rating DESC').fetchall()
         
         products = []
         for row in rows:
@@ -261,31 +841,3 @@ class Database:
             })
         
         return products
-    
-    def get_products_for_issues(self, issue_types: List[str]) -> List[Dict]:
-        """Get products that target specific skin issues"""
-        if not issue_types:
-            return self.get_all_products()[:3]
-        
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Create a query to find products that target any of the detected issues
-        products = self.get_all_products()
-        
-        # Score products based on how many detected issues they address
-        scored_products = []
-        for product in products:
-            score = 0
-            for issue in issue_types:
-                if issue in product['target_issues']:
-                    score += 1
-            
-            if score > 0:
-                scored_products.append((product, score))
-        
-        # Sort by score (descending) then by rating (descending)
-        scored_products.sort(key=lambda x: (x[1], x[0]['rating']), reverse=True)
-        
-        # Return top products
-        return [product for product, score in scored_products]
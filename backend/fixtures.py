@@ -0,0 +1,113 @@
+"""
+Deterministic synthetic face images for benchmarks and regression runs.
+
+Every fixture carries the boxes it planted. The Haar cascade finds the drawn
+faces too, but how many and where depends on the detection settings and the
+OpenCV build; FixedFaceAnalyzer reports the planted boxes instead, which
+keeps the face count, and so the skin detector results, deterministic.
+"""
+
+import os
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from skin_analyzer_opencv import OpenCVSkinAnalyzer
+
+# Resolutions (width, height) and face counts covered by default
+RESOLUTIONS = [(640, 480), (1280, 720), (1920, 1080)]
+FACE_COUNTS = [1, 2, 4]
+
+# Base skin tone (BGR) the faces are drawn in
+SKIN_TONE = (150, 175, 215)
+
+
+def face_boxes(width: int, height: int, faces: int) -> List[List[int]]:
+    """Lay ``faces`` square boxes side by side across the frame"""
+    size = min(int(height * 0.6), width // faces - 10)
+    step = width // faces
+    y = (height - size) // 2
+    return [[i * step + (step - size) // 2, y, size, size] for i in range(faces)]
+
+
+def make_face_image(width: int, height: int, faces: int = 1, seed: int = 0) -> Tuple[np.ndarray, List[List[int]]]:
+    """
+    Draw a frame with ``faces`` skin-toned faces carrying spots, redness,
+    shine and fine lines. The same arguments always give the same image.
+    """
+    rng = np.random.default_rng(seed)
+
+    # Cool, slightly noisy background
+    image = np.empty((height, width, 3), dtype=np.uint8)
+    image[:] = (90, 80, 70)
+    image = cv2.add(image, rng.integers(0, 20, image.shape, dtype=np.uint8))
+
+    boxes = face_boxes(width, height, faces)
+    for x, y, w, h in boxes:
+        center = (x + w // 2, y + h // 2)
+        cv2.ellipse(image, center, (w * 2 // 5, h // 2), 0, 0, 360, SKIN_TONE, -1)
+        scale = w / 200
+
+        # Acne and dark spots
+        for _ in range(12):
+            px, py = _point_in_face(rng, x, y, w, h)
+            cv2.circle(image, (px, py), max(1, int(rng.integers(2, 5) * scale)), (60, 60, 200), -1)
+        for _ in range(10):
+            px, py = _point_in_face(rng, x, y, w, h)
+            cv2.circle(image, (px, py), max(1, int(rng.integers(2, 4) * scale)), (60, 80, 110), -1)
+
+        # Red cheeks and a shiny forehead
+        cv2.ellipse(image, (x + w // 3, y + h * 3 // 5), (int(18 * scale), int(12 * scale)), 0, 0, 360,
+                    (120, 130, 235), -1)
+        cv2.ellipse(image, (x + w // 2, y + h // 4), (int(30 * scale), int(10 * scale)), 0, 0, 360,
+                    (225, 235, 250), -1)
+
+        # Forehead lines
+        for row in range(3):
+            line_y = y + h // 5 + int(row * 8 * scale)
+            cv2.line(image, (x + w // 3, line_y), (x + w * 2 // 3, line_y + int(2 * scale)),
+                     (110, 125, 160), max(1, int(scale)))
+
+    # Sensor noise over the whole frame
+    noise = rng.normal(0, 4, image.shape)
+    image = np.clip(image.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+    return image, boxes
+
+
+def _point_in_face(rng: np.random.Generator, x: int, y: int, w: int, h: int) -> Tuple[int, int]:
+    return int(x + w * rng.uniform(0.25, 0.75)), int(y + h * rng.uniform(0.2, 0.85))
+
+
+def default_corpus(seed: int = 0) -> Dict[str, Tuple[np.ndarray, List[List[int]]]]:
+    """Every default resolution and face count, keyed '<w>x<h>/faces=<n>'"""
+    corpus = {}
+    for width, height in RESOLUTIONS:
+        for faces in FACE_COUNTS:
+            corpus[f"{width}x{height}/faces={faces}"] = make_face_image(width, height, faces, seed)
+    return corpus
+
+
+class FixedFaceAnalyzer(OpenCVSkinAnalyzer):
+    """Analyzer that reports preset face boxes instead of running the cascade"""
+
+    def __init__(self, boxes: List[List[int]] = None, **settings):
+        super().__init__(**settings)
+        self.boxes = boxes or []
+
+    @property
+    def settings(self) -> Dict:
+        return dict(super().settings, boxes=[list(box) for box in self.boxes])
+
+    def _detect_faces(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        return [list(box) for box in self.boxes]
+
+
+def load_image_dir(directory: str) -> Dict[str, Tuple[np.ndarray, None]]:
+    """Real photos from a directory, keyed by file name; faces come from the cascade"""
+    corpus = {}
+    for name in sorted(os.listdir(directory)):
+        image = cv2.imread(os.path.join(directory, name), cv2.IMREAD_COLOR)
+        if image is not None:
+            corpus[name] = (image, None)
+    return corpus
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Boots Skin Care - Golden Output Check
+Records which issues detect_skin_issues reports for an image corpus and
+diffs later runs against that snapshot, so analyzer optimizations can be
+checked for behaviour changes.
+
+    python golden.py record golden.json
+    python golden.py compare golden.json --iou 0.5 --confidence 0.05
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+import fixtures
+from skin_analyzer_opencv import OpenCVSkinAnalyzer
+
+
+def run_corpus(images: str = None) -> Dict[str, List[Dict]]:
+    """Analyze every corpus image, returning its issues keyed by image name"""
+    corpus = fixtures.load_image_dir(images) if images else fixtures.default_corpus()
+    cascade = OpenCVSkinAnalyzer(parallelism=1)
+
+    snapshot = {}
+    for key, (image, boxes) in corpus.items():
+        analyzer = cascade if boxes is None else fixtures.FixedFaceAnalyzer(boxes, parallelism=1)
+        snapshot[key] = [
+            {
+                'type': issue['type'],
+                'confidence': round(float(issue['confidence']), 4),
+                'bbox': [int(issue['bbox'][k]) for k in ('x', 'y', 'width', 'height')]
+            }
+            for issue in analyzer.detect_skin_issues(image)
+        ]
+    return snapshot
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of two (n, 4) arrays of x, y, width, height boxes"""
+    ax0, ay0 = a[:, 0:1], a[:, 1:2]
+    ax1, ay1 = ax0 + a[:, 2:3], ay0 + a[:, 3:4]
+    bx0, by0 = b[:, 0], b[:, 1]
+    bx1, by1 = bx0 + b[:, 2], by0 + b[:, 3]
+
+    overlap_w = np.clip(np.minimum(ax1, bx1) - np.maximum(ax0, bx0), 0, None)
+    overlap_h = np.clip(np.minimum(ay1, by1) - np.maximum(ay0, by0), 0, None)
+    overlap = overlap_w * overlap_h
+    union = a[:, 2:3] * a[:, 3:4] + b[:, 2] * b[:, 3] - overlap
+    return np.divide(overlap, union, out=np.zeros_like(overlap, dtype=np.float64), where=union > 0)
+
+
+def match_issues(expected: List[Dict], actual: List[Dict], min_iou: float) -> Tuple[List, List, List]:
+    """
+    Greedily pair issues of the same type by highest IoU.
+    Returns (matched pairs, missing expected issues, new actual issues).
+    """
+    matched, missing, added = [], [], []
+    for issue_type in sorted({i['type'] for i in expected} | {i['type'] for i in actual}):
+        old = [i for i in expected if i['type'] == issue_type]
+        new = [i for i in actual if i['type'] == issue_type]
+        if not old or not new:
+            missing.extend(old)
+            added.extend(new)
+            continue
+
+        iou = box_iou(np.array([i['bbox'] for i in old], dtype=np.float64),
+                      np.array([i['bbox'] for i in new], dtype=np.float64))
+        used_old, used_new = set(), set()
+        for flat in np.argsort(iou, axis=None)[::-1]:
+            row, col = divmod(int(flat), iou.shape[1])
+            if iou[row, col] < min_iou:
+                break
+            if row in used_old or col in used_new:
+                continue
+            used_old.add(row)
+            used_new.add(col)
+            matched.append((old[row], new[col], float(iou[row, col])))
+
+        missing.extend(issue for k, issue in enumerate(old) if k not in used_old)
+        added.extend(issue for k, issue in enumerate(new) if k not in used_new)
+    return matched, missing, added
+
+
+def compare_snapshots(golden: Dict, current: Dict, min_iou: float, confidence_tolerance: float) -> Dict:
+    """Diff two snapshots image by image; images with no differences are left out"""
+    report = {}
+    for key in sorted(set(golden) | set(current)):
+        matched, missing, added = match_issues(golden.get(key, []), current.get(key, []), min_iou)
+        changed = [
+            {'type': old['type'], 'golden': old, 'current': new, 'iou': round(iou, 3)}
+            for old, new, iou in matched
+            if abs(old['confidence'] - new['confidence']) > confidence_tolerance
+        ]
+        if missing or added or changed:
+            report[key] = {'missing': missing, 'added': added, 'confidence_changed': changed}
+    return report
+
+
+def print_report(report: Dict, golden: Dict, current: Dict):
+    for key, diff in report.items():
+        print(f"\n📷 {key}: {len(golden.get(key, []))} golden / {len(current.get(key, []))} current issues")
+        for issue in diff['missing']:
+            print(f"  - missing {issue['type']} at {issue['bbox']} ({issue['confidence']:.3f})")
+        for issue in diff['added']:
+            print(f"  + new     {issue['type']} at {issue['bbox']} ({issue['confidence']:.3f})")
+        for change in diff['confidence_changed']:
+            print(f"  ~ {change['type']} at {change['current']['bbox']}: confidence "
+                  f"{change['golden']['confidence']:.3f} -> {change['current']['confidence']:.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('command', choices=['record', 'compare'])
+    parser.add_argument('snapshot', help='golden snapshot JSON file')
+    parser.add_argument('--images', help='directory of real photos to use instead of fixtures')
+    parser.add_argument('--iou', type=float, default=0.5, help='minimum bbox IoU for two issues to match')
+    parser.add_argument('--confidence', type=float, default=0.05, help='allowed confidence difference')
+    parser.add_argument('--report', help='write the differences as JSON to this file')
+    args = parser.parse_args()
+
+    current = run_corpus(args.images)
+
+    if args.command == 'record':
+        with open(args.snapshot, 'w') as f:
+            json.dump({'recorded': time.strftime('%Y-%m-%dT%H:%M:%S'), 'images': current}, f, indent=1)
+        total = sum(len(issues) for issues in current.values())
+        print(f"💾 Recorded {total} issues across {len(current)} images to {args.snapshot}")
+        return 0
+
+    with open(args.snapshot) as f:
+        golden = json.load(f)['images']
+    report = compare_snapshots(golden, current, args.iou, args.confidence)
+
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump(report, f, indent=1)
+
+    if not report:
+        print(f"✅ All {len(current)} images match {args.snapshot} "
+              f"(IoU >= {args.iou}, confidence ±{args.confidence})")
+        return 0
+
+    print_report(report, golden, current)
+    print(f"\n❌ {len(report)} of {len(current)} images differ from {args.snapshot}")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
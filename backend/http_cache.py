@@ -0,0 +1,101 @@
+"""
+Pre-serialized, pre-compressed bodies for read-heavy GET endpoints.
+
+The product catalog and the recent analyses list change far less often
+than they are fetched. Each is serialized once per version of its data;
+gzip and brotli variants are compressed on first request and reused, so a
+steady-state fetch costs a dictionary lookup, and a revalidation with the
+version's ETag costs nothing beyond a 304.
+"""
+
+import gzip
+import threading
+from typing import Callable, Dict, Hashable, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are sent as they are; compression would not pay off
+MIN_COMPRESS_SIZE = 1024
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def supported_encodings() -> tuple:
+    """Content codings we can produce, most preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate_encoding(accept_encodings) -> Optional[str]:
+    """Best coding the client accepts (a werkzeug Accept), or None for identity"""
+    return accept_encodings.best_match(supported_encodings())
+
+
+class EncodedBody:
+    """One serialized body and its compressed variants, built on first use"""
+
+    def __init__(self, etag: str, body: bytes):
+        self.etag = etag
+        self.body = body
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding: Optional[str]) -> bytes:
+        if encoding is None or len(self.body) < MIN_COMPRESS_SIZE:
+            return self.body
+        data = self._encoded.get(encoding)
+        if data is None:
+            with self._lock:
+                data = self._encoded.get(encoding)
+                if data is None:
+                    if encoding == 'br':
+                        data = brotli.compress(self.body, quality=BROTLI_QUALITY)
+                    elif encoding == 'gzip':
+                        data = gzip.compress(self.body, compresslevel=GZIP_LEVEL, mtime=0)
+                    else:
+                        raise ValueError(f"Unsupported content coding: {encoding}")
+                    self._encoded[encoding] = data
+        return data
+
+    def compresses(self) -> bool:
+        return len(self.body) >= MIN_COMPRESS_SIZE
+
+
+class VersionedBody:
+    """
+    Latest body of one endpoint, rebuilt only when the version of the data
+    behind it changes. The ETag is derived from the version, so it is the
+    same in every worker process that sees the same data.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._current = None  # (version, EncodedBody)
+        self._lock = threading.Lock()
+        self.builds = 0
+        self.hits = 0
+
+    def get(self, version: Hashable, etag_suffix: str, build: Callable[[], bytes]) -> EncodedBody:
+        """Body for ``version``, calling ``build`` only if it is not the cached one"""
+        current = self._current
+        if current is not None and current[0] == version:
+            self.hits += 1
+            return current[1]
+
+        with self._lock:
+            if self._current is None or self._current[0] != version:
+                self._current = (version, EncodedBody(f"{self.name}-{etag_suffix}", build()))
+                self.builds += 1
+            return self._current[1]
+
+    def stats(self) -> Dict:
+        current = self._current[1] if self._current else None
+        return {
+            'etag': current.etag if current else None,
+            'bytes': len(current.body) if current else 0,
+            'builds': self.builds,
+            'hits': self.hits
+        }
@@ -0,0 +1,87 @@
+"""
+Decode uploaded image bytes straight to a BGR ndarray for the analyzer.
+
+OpenCV decodes directly into BGR, converts grayscale/RGBA/16-bit inputs to
+8-bit BGR and applies the EXIF orientation, so a typical upload is decoded
+into exactly one full-size buffer. Large JPEGs are downscaled during
+decoding (DCT scaling via IMREAD_REDUCED_*), so huge phone photos are never
+decoded at full resolution. Formats OpenCV cannot read fall back to PIL.
+"""
+
+import io
+import os
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageOps
+
+# Longest side, in pixels, of the image handed to the analyzer
+DEFAULT_MAX_SIDE = int(os.environ.get('IMAGE_MAX_SIDE', 1920))
+
+# Decode-time reduction factors OpenCV supports, largest first
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+class ImageDecodeError(ValueError):
+    """The uploaded bytes are not a decodable image"""
+
+
+def decode_image(data: bytes, max_side: Optional[int] = DEFAULT_MAX_SIDE) -> Tuple[np.ndarray, float]:
+    """
+    Decode ``data`` to a BGR image whose longer side is at most ``max_side``.
+
+    Returns ``(image, scale)`` where ``scale`` is the working size divided by
+    the original size (1.0 when no downscaling happened), so coordinates
+    found on the working image can be mapped back to the upload.
+    """
+    original_side, is_jpeg = _peek(data)
+    if original_side is None:
+        raise ImageDecodeError("Unrecognised image format")
+
+    flags = cv2.IMREAD_COLOR
+    if max_side and is_jpeg:
+        # Largest DCT reduction that still leaves at least max_side pixels
+        for factor, reduced_flag in _REDUCED_FLAGS:
+            if original_side // factor >= max_side:
+                flags = reduced_flag
+                break
+
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), flags)
+    if image is None:
+        image = _decode_with_pil(data, max_side)
+
+    # Finish with an exact resize when DCT scaling alone was not enough
+    if max_side and max(image.shape[:2]) > max_side:
+        ratio = max_side / max(image.shape[:2])
+        size = (max(1, round(image.shape[1] * ratio)), max(1, round(image.shape[0] * ratio)))
+        image = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    return image, max(image.shape[:2]) / original_side
+
+
+def _peek(data: bytes) -> Tuple[Optional[int], bool]:
+    """Longer side and JPEG-ness from the image header, without decoding pixels"""
+    try:
+        with Image.open(io.BytesIO(data)) as header:
+            return max(header.size), header.format == 'JPEG'
+    except Exception:
+        return None, False
+
+
+def _decode_with_pil(data: bytes, max_side: Optional[int]) -> np.ndarray:
+    try:
+        image = Image.open(io.BytesIO(data))
+        if max_side:
+            # JPEG draft mode also scales during decoding
+            image.draft('RGB', (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+    except Exception as e:
+        raise ImageDecodeError(str(e)) from e
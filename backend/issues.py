@@ -0,0 +1,115 @@
+"""
+Compact skin issue records and a single-pass JSON encoder for them.
+
+Detectors emit SkinIssue objects holding native Python numbers, so results
+never need a recursive NumPy-to-JSON conversion. SkinIssue still supports
+``issue['type']`` / ``issue['bbox']`` style access for code written against
+the original dict format.
+"""
+
+import json
+from typing import Dict, Iterable, Union
+
+import numpy as np
+
+# C-accelerated JSON string quoting from the standard library
+_quote = json.encoder.encode_basestring
+
+BBOX_KEYS = ('x', 'y', 'width', 'height')
+
+
+class SkinIssue:
+    """One detected skin issue with its bounding box flattened into slots"""
+
+    __slots__ = ('id', 'type', 'confidence', 'x', 'y', 'width', 'height')
+
+    def __init__(self, id: str, type: str, confidence: float, x: int, y: int, width: int, height: int):
+        self.id = id
+        self.type = type
+        self.confidence = confidence
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+
+    @property
+    def bbox(self) -> Dict[str, int]:
+        return {'x': self.x, 'y': self.y, 'width': self.width, 'height': self.height}
+
+    def __getitem__(self, key: str):
+        if key == 'bbox':
+            return self.bbox
+        if key in ('id', 'type', 'confidence'):
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self) -> str:
+        return (f"SkinIssue({self.id!r}, {self.type!r}, {self.confidence:.3f}, "
+                f"{self.x}, {self.y}, {self.width}, {self.height})")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, SkinIssue):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def to_dict(self) -> Dict:
+        return {'id': self.id, 'type': self.type, 'confidence': self.confidence, 'bbox': self.bbox}
+
+    def scaled(self, factor: float) -> 'SkinIssue':
+        """Copy with the box multiplied by ``factor``"""
+        return SkinIssue(self.id, self.type, self.confidence,
+                         int(round(self.x * factor)), int(round(self.y * factor)),
+                         int(round(self.width * factor)), int(round(self.height * factor)))
+
+    def to_json(self) -> str:
+        return (f'{{"id":{_quote(self.id)},"type":{_quote(self.type)},'
+                f'"confidence":{float(self.confidence)!r},'
+                f'"bbox":{{"x":{self.x},"y":{self.y},"width":{self.width},"height":{self.height}}}}}')
+
+
+IssueLike = Union[SkinIssue, Dict]
+
+
+def as_issue(issue: IssueLike) -> SkinIssue:
+    """Build a SkinIssue from the dict format (e.g. other analyzers, stored rows)"""
+    if isinstance(issue, SkinIssue):
+        return issue
+    bbox = issue['bbox']
+    return SkinIssue(str(issue['id']), str(issue['type']), float(issue['confidence']),
+                     *(int(bbox[key]) for key in BBOX_KEYS))
+
+
+def _to_native(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> str:
+    """json.dumps that also accepts NumPy scalars and arrays"""
+    return json.dumps(value, separators=(',', ':'), default=_to_native)
+
+
+def dumps_issues(issues: Iterable[IssueLike]) -> str:
+    """Encode an issue list as a JSON array in one pass"""
+    return '[' + ','.join(issue.to_json() if isinstance(issue, SkinIssue) else dumps(issue)
+                          for issue in issues) + ']'
+
+
+def dumps_analysis(analysis: Dict) -> str:
+    """Encode an analysis result as a JSON object, issues first"""
+    fields = ['"issues":' + dumps_issues(analysis['issues'])]
+    for key, value in analysis.items():
+        if key != 'issues':
+            fields.append(f'{_quote(key)}:{dumps(value)}')
+    return '{' + ','.join(fields) + '}'
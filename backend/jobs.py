@@ -0,0 +1,163 @@
+"""
+Background analysis jobs.
+
+POST /api/analyze/jobs hands the decoded image to a JobQueue and returns at
+once; a pool of worker threads runs the analysis while clients poll the
+job or follow its progress as server-sent events.
+"""
+
+import queue
+import threading
+import time
+import uuid
+from typing import Callable, Dict, Optional
+
+
+class QueueFullError(Exception):
+    """The job queue is at capacity"""
+
+
+class Job:
+    """State of one queued analysis; every change bumps ``version``"""
+
+    def __init__(self, work: Optional[Callable[['Job'], bytes]]):
+        self.id = str(uuid.uuid4())
+        self.work = work
+        self.status = 'queued'
+        self.stage = 'queued'
+        self.progress = 0.0
+        self.result = None  # JSON response body once done
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.version = 0
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def to_dict(self) -> Dict:
+        return {
+            'id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': round(self.progress, 3),
+            'error': self.error
+        }
+
+
+class JobQueue:
+    """Bounded FIFO of analysis jobs served by a fixed pool of worker threads"""
+
+    def __init__(self, workers: int = 2, max_queue: int = 64, retention: float = 600.0):
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.retention = retention
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._jobs = {}
+        self._changed = threading.Condition()
+        self._threads = []
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _ensure_workers(self):
+        if not self._threads:
+            for index in range(self.workers):
+                thread = threading.Thread(target=self._worker, name=f'analysis-job-{index}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, work: Callable[[Job], bytes]) -> Job:
+        """Queue ``work``, which receives its Job and returns the JSON result body"""
+        job = Job(work)
+        with self._changed:
+            self._ensure_workers()
+            self._prune()
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.rejected += 1
+                raise QueueFullError(f"{self.max_queue} analysis jobs already queued")
+            self._jobs[job.id] = job
+        return job
+
+    def add_finished(self, result: bytes) -> Job:
+        """Register a job whose result is already known (e.g. a cache hit)"""
+        job = Job(None)
+        job.status = job.stage = 'done'
+        job.progress = 1.0
+        job.result = result
+        job.finished = time.time()
+        with self._changed:
+            self._prune()
+            self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._changed:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def update(self, job: Job, stage: str, progress: float):
+        """Report progress from inside a job's work function"""
+        with self._changed:
+            job.stage = stage
+            job.progress = progress
+            job.version += 1
+            self._changed.notify_all()
+
+    def wait(self, job: Job, seen_version: int, timeout: float) -> bool:
+        """Block until ``job`` changes past ``seen_version``; False on timeout"""
+        with self._changed:
+            return self._changed.wait_for(lambda: job.version > seen_version, timeout)
+
+    def stats(self) -> Dict:
+        with self._changed:
+            running = sum(1 for job in self._jobs.values() if job.status == 'running')
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'queued': self._queue.qsize(),
+                'running': running,
+                'completed': self.completed,
+                'failed': self.failed,
+                'rejected': self.rejected
+            }
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            with self._changed:
+                job.status = job.stage = 'running'
+                job.version += 1
+                self._changed.notify_all()
+            try:
+                result = job.work(job)
+                with self._changed:
+                    job.result = result
+                    job.status = job.stage = 'done'
+                    job.progress = 1.0
+                    self.completed += 1
+            except Exception as e:
+                print(f"❌ Analysis job {job.id} failed: {e}")
+                with self._changed:
+                    job.status = job.stage = 'failed'
+                    job.error = str(e)
+                    self.failed += 1
+            finally:
+                with self._changed:
+                    # The work closure holds the decoded image; only the result is kept
+                    job.work = None
+                    job.finished = time.time()
+                    job.version += 1
+                    self._prune()
+                    self._changed.notify_all()
+                self._queue.task_done()
+
+    def _prune(self):
+        """Forget finished jobs older than the retention period (lock held)"""
+        cutoff = time.time() - self.retention
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
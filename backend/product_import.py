@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Boots Skin Care - Bulk Product Import
+Streams a product feed (CSV or JSON Lines, optionally gzipped) into the
+products table in large batched transactions. Rows are validated first;
+by default only products whose content changed since the last import are
+written.
+
+    python product_import.py feed.csv
+    python product_import.py feed.jsonl.gz --full --delete-missing
+
+CSV feeds need a header row with the product fields; target_issues may be
+a JSON list or a '|' separated string.
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import io
+import json
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from database import Database
+
+REQUIRED_FIELDS = ('id', 'name', 'description', 'price', 'category', 'target_issues', 'brand')
+
+UPSERT_PRODUCT_SQL = '''
+    INSERT INTO products (id, name, description, price, image_url, category, target_issues, rating, brand)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (id) DO UPDATE SET
+        name = excluded.name,
+        description = excluded.description,
+        price = excluded.price,
+        image_url = excluded.image_url,
+        category = excluded.category,
+        target_issues = excluded.target_issues,
+        rating = excluded.rating,
+        brand = excluded.brand
+'''
+
+UPSERT_HASH_SQL = '''
+    INSERT INTO product_hashes (id, hash) VALUES (?, ?)
+    ON CONFLICT (id) DO UPDATE SET hash = excluded.hash
+'''
+
+# Validation messages printed before the rest are only counted
+MAX_REPORTED_ERRORS = 10
+
+
+class ImportReport:
+    """Counters and timing for one import run"""
+
+    def __init__(self):
+        self.read = 0
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.invalid = 0
+        self.deleted = 0
+        self.batches = 0
+        self.delete_skipped = None  # why --delete-missing did not delete, if it did not
+        self.errors = []
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.read / self.elapsed if self.elapsed > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'read': self.read,
+            'inserted': self.inserted,
+            'updated': self.updated,
+            'unchanged': self.unchanged,
+            'invalid': self.invalid,
+            'deleted': self.deleted,
+            'batches': self.batches,
+            'elapsed_seconds': round(self.elapsed, 3),
+            'rows_per_second': round(self.rows_per_second, 1)
+        }
+
+
+def _open_text(path: str):
+    if path.endswith('.gz'):
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+
+def detect_format(path: str) -> str:
+    name = path[:-3] if path.endswith('.gz') else path
+    return 'csv' if name.lower().endswith('.csv') else 'jsonl'
+
+
+def read_feed(path: str, feed_format: Optional[str] = None) -> Iterator[Tuple[int, Dict]]:
+    """Yield (line number, raw record) pairs without loading the whole feed"""
+    feed_format = feed_format or detect_format(path)
+    with _open_text(path) as f:
+        if feed_format == 'csv':
+            reader = csv.DictReader(f)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except ValueError as e:
+                        yield line_number, {'_error': f"invalid JSON: {e}"}
+
+
+def validate_product(record: Dict) -> tuple:
+    """Normalize a raw record to a products row; raises ValueError when invalid"""
+    if not isinstance(record, dict):
+        raise ValueError(f"expected an object, got {type(record).__name__}")
+    if '_error' in record:
+        raise ValueError(record['_error'])
+    missing = [field for field in REQUIRED_FIELDS if record.get(field) in (None, '')]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+
+    issues = record['target_issues']
+    if isinstance(issues, str):
+        issues = json.loads(issues) if issues.lstrip().startswith('[') else issues.split('|')
+    if not isinstance(issues, list):
+        raise ValueError("target_issues must be a list")
+    issues = [str(issue).strip() for issue in issues if str(issue).strip()]
+    if not issues:
+        raise ValueError("target_issues is empty")
+
+    price = float(record['price'])
+    if price < 0:
+        raise ValueError(f"negative price {price}")
+    rating = float(record['rating']) if record.get('rating') not in (None, '') else 4.0
+    if not 0.0 <= rating <= 5.0:
+        raise ValueError(f"rating {rating} outside 0-5")
+
+    return (
+        str(record['id']).strip(),
+        str(record['name']).strip(),
+        str(record['description']).strip(),
+        price,
+        str(record.get('image_url') or '') or None,
+        str(record['category']).strip(),
+        json.dumps(issues),
+        rating,
+        str(record['brand']).strip()
+    )
+
+
+def row_hash(row: tuple) -> str:
+    # Fields joined by the ASCII unit separator, which never occurs in feeds
+    return hashlib.sha1('\x1f'.join(map(str, row)).encode('utf-8')).hexdigest()
+
+
+def import_products(db: Database, path: str, feed_format: Optional[str] = None, batch_size: int = 5000,
+                    incremental: bool = True, delete_missing: bool = False) -> ImportReport:
+    """
+    Upsert every valid product of the feed at ``path``.
+
+    With ``incremental`` rows whose content hash matches the previous import
+    are skipped. ``delete_missing`` removes products that are not in the
+    feed, making the table an exact copy of it. It is skipped when any row
+    was invalid or none was valid, so a bad or truncated feed never deletes
+    products.
+    """
+    report = ImportReport()
+    with db.pool.connection() as conn:
+        # Known products and the content hash they were last imported with
+        known = dict(conn.execute(
+            'SELECT products.id, product_hashes.hash FROM products '
+            'LEFT JOIN product_hashes ON product_hashes.id = products.id'
+        ).fetchall())
+        seen = set()
+        batch: List[Tuple[tuple, str]] = []
+
+        def flush():
+            conn.executemany(UPSERT_PRODUCT_SQL, [row for row, _ in batch])
+            conn.executemany(UPSERT_HASH_SQL, [(row[0], digest) for row, digest in batch])
+            conn.commit()
+            report.batches += 1
+            batch.clear()
+
+        for line_number, record in read_feed(path, feed_format):
+            report.read += 1
+            # Products whose row is invalid are still in the feed
+            if isinstance(record, dict) and record.get('id') not in (None, ''):
+                seen.add(str(record['id']).strip())
+            try:
+                row = validate_product(record)
+            except (ValueError, TypeError) as e:
+                report.invalid += 1
+                if len(report.errors) < MAX_REPORTED_ERRORS:
+                    report.errors.append(f"line {line_number}: {e}")
+                continue
+
+            product_id = row[0]
+            digest = row_hash(row)
+            if product_id in known:
+                if incremental and known[product_id] == digest:
+                    report.unchanged += 1
+                    continue
+                report.updated += 1
+            else:
+                report.inserted += 1
+            known[product_id] = digest
+
+            batch.append((row, digest))
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+
+        if delete_missing and report.invalid:
+            report.delete_skipped = f"{report.invalid} invalid rows"
+        elif delete_missing and report.read == report.invalid:
+            report.delete_skipped = "no valid rows in the feed"
+        elif delete_missing:
+            stale = [(product_id,) for product_id in known if product_id not in seen]
+            conn.executemany('DELETE FROM products WHERE id = ?', stale)
+            conn.executemany('DELETE FROM product_hashes WHERE id = ?', stale)
+            conn.commit()
+            report.deleted = len(stale)
+
+    report.elapsed = time.perf_counter() - report.started
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('feed', help='CSV or JSON Lines product feed (.gz allowed)')
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help='feed format (default: from the file name)')
+    parser.add_argument('--db', default='boots_skincare.db', help='SQLite database path')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per transaction')
+    parser.add_argument('--full', action='store_true', help='rewrite every row, not only changed ones')
+    parser.add_argument('--delete-missing', action='store_true', help='delete products absent from the feed')
+    args = parser.parse_args()
+
+    db = Database(args.db)
+    db.initialize_database()
+
+    print(f"📦 Importing products from {args.feed}...")
+    report = import_products(db, args.feed, feed_format=args.format, batch_size=args.batch_size,
+                             incremental=not args.full, delete_missing=args.delete_missing)
+
+    for error in report.errors:
+        print(f"  ⚠️ {error}")
+    if report.invalid > len(report.errors):
+        print(f"  ⚠️ ... {report.invalid - len(report.errors)} more invalid rows")
+    if report.delete_skipped:
+        print(f"  ⚠️ Not deleting missing products: {report.delete_skipped}")
+    print(f"✅ {report.read} rows in {report.elapsed:.2f}s ({report.rows_per_second:,.0f} rows/s): "
+          f"{report.inserted} inserted, {report.updated} updated, {report.unchanged} unchanged, "
+          f"{report.deleted} deleted, {report.invalid} invalid")
+    return 1 if report.invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
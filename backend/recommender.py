@@ -0,0 +1,184 @@
+"""
+Top-k product ranking for detected skin issues.
+
+Each catalog snapshot is turned into an issue-by-product matrix once. A
+request builds a weight per issue type (the summed confidence of its
+detections, so both count and certainty matter), scores every product with
+one matrix-vector product and selects the best k with argpartition, so the
+cost grows linearly with the catalog and never needs a full sort.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import CatalogSnapshot, ProductCatalog
+
+# Products with equal scores are ordered by rating; the tie-break is kept
+# far below any real score difference
+RATING_TIE_BREAK = 1e-6
+
+# Issue weights are rounded to this step in cache signatures, so analyses
+# with nearly equal confidences share one cached ranking
+SIGNATURE_STEP = 0.1
+
+
+class RankingModel:
+    """Issue-by-product matrix and per-product metadata for one catalog snapshot"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.version = snapshot.version
+        self.products = snapshot.products
+        self.issue_rows = {issue_type: row for row, issue_type in enumerate(sorted(snapshot.index))}
+
+        count = len(self.products)
+        self.matrix = np.zeros((len(self.issue_rows), count), dtype=np.float32)
+        for issue_type, positions in snapshot.index.items():
+            self.matrix[self.issue_rows[issue_type], positions] = 1.0
+
+        # Products are stored best rated first, so position is the rating rank
+        self.tie_break = RATING_TIE_BREAK * (1.0 - np.arange(count, dtype=np.float64) / max(count, 1))
+
+        categories = sorted({product['category'] for product in self.products})
+        codes = {category: code for code, category in enumerate(categories)}
+        self.categories = np.array([codes[product['category']] for product in self.products], dtype=np.int32)
+
+
+class Recommendation:
+    """Ranked products with their scores and the share of issue weight they cover"""
+
+    def __init__(self, products: List[Dict], scores: List[float], confidence: float, version: int):
+        self.products = products
+        self.scores = scores
+        self.confidence = confidence
+        self.version = version  # catalog version the ranking was computed from
+
+
+class Recommender:
+    """Ranks catalog products against weighted issues; rebuilt when the catalog changes"""
+
+    def __init__(self, catalog: ProductCatalog, max_per_category: Optional[int] = None):
+        self.catalog = catalog
+        self.max_per_category = max_per_category
+        self._model = None
+        self._lock = threading.Lock()
+
+    def model(self) -> RankingModel:
+        snapshot = self.catalog.snapshot()
+        model = self._model
+        if model is None or model.version != snapshot.version:
+            with self._lock:
+                if self._model is None or self._model.version != snapshot.version:
+                    self._model = RankingModel(snapshot)
+                model = self._model
+        return model
+
+    @staticmethod
+    def issue_weights(issues: Iterable[Tuple[str, float]]) -> Dict[str, float]:
+        """Summed confidence per issue type"""
+        weights = defaultdict(float)
+        for issue_type, confidence in issues:
+            weights[issue_type] += float(confidence)
+        return dict(weights)
+
+    @classmethod
+    def signature(cls, issues: Iterable[Tuple[str, float]]) -> Tuple[str, Dict[str, float]]:
+        """
+        Canonical cache key for an issue set, and the quantized weights it
+        stands for; ranking those weights gives the result cached under it.
+        """
+        weights = {
+            issue_type: round(round(weight / SIGNATURE_STEP) * SIGNATURE_STEP, 3)
+            for issue_type, weight in cls.issue_weights(issues).items()
+        }
+        key = ','.join(f'{issue_type}={weight:g}' for issue_type, weight in sorted(weights.items()))
+        return key, weights
+
+    def recommend(self, issues: Iterable[Tuple[str, float]], k: int = 3,
+                  max_per_category: Optional[int] = None) -> Recommendation:
+        """
+        Best ``k`` products for ``(issue type, confidence)`` pairs.
+
+        At most ``max_per_category`` products of one category are chosen
+        (no limit when None or not positive). When fewer products match, the rest are the
+        best rated remaining products, with a score of 0.
+        """
+        if max_per_category is None:
+            max_per_category = self.max_per_category
+        if max_per_category is not None and max_per_category <= 0:
+            max_per_category = None
+        model = self.model()
+        weights = self.issue_weights(issues)
+        count = len(model.products)
+        if count == 0 or k <= 0:
+            return Recommendation([], [], 0.0, model.version)
+
+        vector = np.zeros(len(model.issue_rows), dtype=np.float32)
+        for issue_type, weight in weights.items():
+            row = model.issue_rows.get(issue_type)
+            if row is not None:
+                vector[row] = weight
+        scores = vector @ model.matrix
+
+        ranked = self._select(scores.astype(np.float64) + model.tie_break, model, k, max_per_category)
+        positions = [position for position in ranked if scores[position] > 0]
+        chosen = set(positions)
+
+        # Pad with the best rated products, still honouring the category limit
+        if len(positions) < k:
+            per_category = defaultdict(int)
+            for position in positions:
+                per_category[model.categories[position]] += 1
+            for position in range(count):
+                if len(positions) >= k:
+                    break
+                category = model.categories[position]
+                if position in chosen or (max_per_category and per_category[category] >= max_per_category):
+                    continue
+                positions.append(position)
+                chosen.add(position)
+                per_category[category] += 1
+
+        # Share of the detected issue weight that the chosen products target
+        total = sum(weights.values())
+        confidence = 0.0
+        if total > 0 and positions:
+            covered = model.matrix[:, positions].max(axis=1)
+            confidence = float(vector @ covered) / total
+
+        return Recommendation(
+            [model.products[position] for position in positions],
+            [round(float(scores[position]), 4) for position in positions],
+            round(confidence, 3),
+            model.version
+        )
+
+    @staticmethod
+    def _select(keys: np.ndarray, model: RankingModel, k: int, max_per_category: Optional[int]) -> List[int]:
+        """Positions of the k highest keys, best first, within the category limit"""
+        count = len(keys)
+        pool = min(count, k if not max_per_category else k * 4)
+        while True:
+            if pool < count:
+                candidates = np.argpartition(-keys, pool - 1)[:pool]
+            else:
+                candidates = np.arange(count)
+            candidates = candidates[np.argsort(-keys[candidates], kind='stable')]
+            if not max_per_category:
+                return candidates[:k].tolist()
+
+            chosen = []
+            per_category = defaultdict(int)
+            for position in candidates.tolist():
+                category = model.categories[position]
+                if per_category[category] < max_per_category:
+                    chosen.append(position)
+                    per_category[category] += 1
+                    if len(chosen) == k:
+                        return chosen
+            if pool >= count:
+                return chosen
+            # Too many candidates shared a category; widen the pool
+            pool = min(count, pool * 4)
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Boots Skin Care - Production Server
+Serves the API from several pre-forked worker processes sharing one
+listening socket, so every core takes requests. Each worker loads the
+database and skin analyzer and runs a warm-up analysis before it accepts
+traffic.
+
+    python serve.py --workers 4 --port 5000
+    kill -HUP <server pid>     # restart workers one at a time
+    kill -TERM <server pid>    # finish in-flight requests, then stop
+
+Where fork() is unavailable (Windows), or with --workers 1, a single
+process serves requests from a thread per connection instead.
+"""
+
+import argparse
+import os
+import select
+import signal
+import socket
+import sys
+import threading
+import time
+
+# Seconds a worker may take to load and warm up before it is given up on
+READY_TIMEOUT = 120
+
+
+def warm_up(app_module):
+    """Run one analysis on a synthetic frame so the first real request is not slow"""
+    import cv2
+    import fixtures
+    from image_decode import decode_image
+
+    started = time.perf_counter()
+    frame, boxes = fixtures.make_face_image(640, 480, faces=1)
+    _, encoded = cv2.imencode('.jpg', frame)
+    image, _ = decode_image(encoded.tobytes(), max_side=app_module.IMAGE_MAX_SIDE)
+
+    analyzer = app_module.skin_analyzer
+    analyzer.detect_skin_issues(image)
+
+    # Tracked sessions skip the cascade and follow faces by template
+    # matching; seeding a tracker with the planted boxes warms that path too
+    if app_module.tracking_sessions is not None:
+        from skin_analyzer_opencv import FaceTracker
+        tracker = FaceTracker()
+        tracker.reset(image, boxes)
+        analyzer.detect_skin_issues(image, tracker=tracker)
+
+    print(f"🔥 Worker {os.getpid()} warmed up in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+def load_app(warm: bool = True):
+    """Import the Flask app (database + analyzer) and get it ready for traffic"""
+    import app as app_module
+    app_module.db.initialize_database()
+    if warm:
+        warm_up(app_module)
+    return app_module
+
+
+def serve_until_stopped(server, app_module, grace: float):
+    """Serve until SIGTERM/SIGINT, then drain in-flight requests and queued jobs"""
+    def stop(signum, frame):
+        # shutdown() blocks until serve_forever returns, so call it elsewhere
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Join request threads on close instead of abandoning them
+    server.daemon_threads = False
+    server.serve_forever()
+    server.server_close()
+
+    deadline = time.monotonic() + grace
+    while time.monotonic() < deadline:
+        jobs = app_module.job_queue.stats()
+        if not jobs['queued'] and not jobs['running']:
+            break
+        time.sleep(0.1)
+
+    # Commit analyses still queued for write-behind, within what is left of the grace period
+    app_module.db.close(timeout=max(1.0, deadline - time.monotonic()))
+
+
+def run_worker(listener: socket.socket, ready_fd: int, args):
+    """Body of a forked worker process; never returns"""
+    from werkzeug.serving import make_server
+
+    status = 0
+    try:
+        # The master decides when workers stop and restart
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+        app_module = load_app(warm=not args.no_warmup)
+        server = make_server(args.host, args.port, app_module.app, threaded=True, fd=listener.fileno())
+        os.write(ready_fd, b'1')
+        os.close(ready_fd)
+        print(f"✅ Worker {os.getpid()} accepting requests")
+
+        serve_until_stopped(server, app_module, args.grace)
+        print(f"👋 Worker {os.getpid()} stopped")
+    except Exception as e:
+        print(f"❌ Worker {os.getpid()} failed: {e}")
+        import traceback
+        traceback.print_exc()
+        status = 1
+    finally:
+        sys.stdout.flush()
+        os._exit(status)
+
+
+class Master:
+    """Pre-forks workers, replaces any that die and restarts them on SIGHUP"""
+
+    def __init__(self, listener: socket.socket, args):
+        self.listener = listener
+        self.args = args
+        self.workers = set()
+        self.stopping = False
+        self.restart_requested = False
+
+    def spawn(self):
+        """Fork a worker; returns (pid, fd that becomes readable once it is ready)"""
+        ready_read, ready_write = os.pipe()
+        sys.stdout.flush()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_read)
+            run_worker(self.listener, ready_write, self.args)
+        os.close(ready_write)
+        self.workers.add(pid)
+        return pid, ready_read
+
+    def wait_ready(self, pid: int, ready_fd: int) -> bool:
+        try:
+            readable, _, _ = select.select([ready_fd], [], [], READY_TIMEOUT)
+            return bool(readable) and os.read(ready_fd, 1) == b'1'
+        finally:
+            os.close(ready_fd)
+
+    def stop_worker(self, pid: int):
+        """SIGTERM a worker and wait for it, killing it after the grace period"""
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        deadline = time.monotonic() + self.args.grace + 5
+        while time.monotonic() < deadline:
+            try:
+                done, _ = os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if done:
+                break
+            time.sleep(0.1)
+        else:
+            print(f"⚠️ Worker {pid} did not stop in time, killing it")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.workers.discard(pid)
+
+    def rolling_restart(self):
+        """Replace workers one at a time so capacity never drops by more than one"""
+        print(f"🔄 Restarting {len(self.workers)} workers...")
+        for old_pid in list(self.workers):
+            new_pid, ready_fd = self.spawn()
+            if not self.wait_ready(new_pid, ready_fd):
+                print(f"❌ Replacement worker {new_pid} failed to start; keeping the old workers")
+                self.stop_worker(new_pid)
+                return
+            self.stop_worker(old_pid)
+        print("✅ All workers restarted")
+
+    def reap(self):
+        """Replace workers that exited without being asked to"""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if not pid:
+                return
+            if pid in self.workers:
+                self.workers.discard(pid)
+                if not self.stopping:
+                    print(f"⚠️ Worker {pid} exited unexpectedly (status {status}), starting a replacement")
+                    time.sleep(1)
+                    self.wait_ready(*self.spawn())
+
+    def run(self) -> int:
+        def request_stop(signum, frame):
+            self.stopping = True
+
+        def request_restart(signum, frame):
+            self.restart_requested = True
+
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
+        signal.signal(signal.SIGHUP, request_restart)
+
+        started = [self.spawn() for _ in range(self.args.workers)]
+        ready = sum(self.wait_ready(pid, fd) for pid, fd in started)
+        if not ready:
+            print("❌ No worker started; see the errors above")
+            self.shutdown()
+            return 1
+        print(f"\n✨ {ready} workers ready on http://{self.args.host}:{self.args.port} (server pid {os.getpid()})")
+
+        while not self.stopping:
+            if self.restart_requested:
+                self.restart_requested = False
+                self.rolling_restart()
+            self.reap()
+            time.sleep(0.2)
+
+        self.shutdown()
+        return 0
+
+    def shutdown(self):
+        print(f"\n🛑 Stopping {len(self.workers)} workers...")
+        self.stopping = True
+        # Signal everyone first so the workers drain in parallel
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(self.workers):
+            self.stop_worker(pid)
+        self.listener.close()
+        print("👋 Server stopped")
+
+
+def serve_threaded(args) -> int:
+    """Single process, one thread per connection"""
+    from werkzeug.serving import make_server
+
+    app_module = load_app(warm=not args.no_warmup)
+    server = make_server(args.host, args.port, app_module.app, threaded=True)
+    print(f"\n✨ Serving on http://{args.host}:{args.port} (single process, threaded)")
+    serve_until_stopped(server, app_module, args.grace)
+    print("👋 Server stopped")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default=os.environ.get('HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', 5000)))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('WEB_WORKERS', os.cpu_count() or 1)),
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--grace', type=float, default=30.0,
+                        help='seconds a stopping worker may spend finishing requests and jobs')
+    parser.add_argument('--no-warmup', action='store_true', help='skip the warm-up analysis')
+    args = parser.parse_args()
+
+    print("🚀 Boots Skin Care - Production Server")
+    print("=" * 50)
+
+    if args.workers <= 1 or not hasattr(os, 'fork'):
+        return serve_threaded(args)
+
+    # Queued analyses live in the memory of the worker that queued them, so
+    # another worker would answer /api/recommendations/<id> without them
+    if os.environ.get('DB_WRITE_BEHIND', '0') == '1':
+        print("❌ DB_WRITE_BEHIND=1 needs a single worker; use --workers 1 or unset it")
+        return 2
+
+    # Share the cores between workers unless configured explicitly
+    per_worker = str(max(1, (os.cpu_count() or 1) // args.workers))
+    os.environ.setdefault('ANALYZE_MAX_CONCURRENT', per_worker)
+    os.environ.setdefault('SKIN_ANALYZER_POOL_SIZE', per_worker)
+
+    # Create tables and sample data once, before workers race to do it
+    from database import Database
+    Database().initialize_database()
+
+    listener = socket.create_server((args.host, args.port), backlog=1024)
+    return Master(listener, args).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -78,15 +78,15 @@ def test_imports():
         print(f"❌ Component test failed: {e}")
         return False
 
-def start_server():
-    """Start the Flask server"""
+def start_server(production=False):
+    """Start the Flask server (multi-worker serve.py in production mode)"""
     try:
         print("\n🚀 Starting Boots Skin Care Backend Server...")
         print("🌐 Server will be available at: http://localhost:5000")
         print("📝 Press Ctrl+C to stop the server")
         print("-" * 50)
         
-        subprocess.run([sys.executable, "app.py"])
+        subprocess.run([sys.executable, "serve.py" if production else "app.py"])
     except KeyboardInterrupt:
         print("\n👋 Server stopped by user")
     except Exception as e:
@@ -113,7 +113,7 @@ def main():
         return 1
     
     # Start server
-    start_server()
+    start_server(production="--production" in sys.argv)
     return 0
 
 if __name__ == "__main__":
@@ -1,6 +1,267 @@
+import os
+import threading
+import time
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from itertools import islice
 import cv2
 import numpy as np
-from typing import List, Dict, Tuple
+import timing
+from issues import SkinIssue
+from typing import List, Dict, Tuple, Union, Optional, Iterable, Iterator
+
+# Per-box cost, in pixels of summed-area table, of averaging a bounding box
+# directly; extract_blobs picks whichever way reads fewer pixels
+BOX_MEAN_OVERHEAD = 256
+
+# Smallest face, in pixels of the detection image, the cascade looks for
+MIN_FACE_SIZE = 30
+
+# Defaults for OpenCVSkinAnalyzer(min_face_size=..., detection_max_side=...):
+# faces from 60 px are found in any frame up to 1920 px, on a copy at most
+# 960 px long
+DEFAULT_MIN_FACE_SIZE = 60
+DEFAULT_DETECTION_SIDE = 960
+
+# Face size, in pixels, that the refinement pass rescales each face crop to
+REFINE_FACE_SIZE = 120
+
+# Side, in pixels, of the downscaled face patch used for tracking
+TRACK_TEMPLATE_SIZE = 48
+
+# Detectors run for every face; results are merged in this order
+DETECTORS = (
+    '_detect_acne',
+    '_detect_dark_spots',
+    '_detect_redness',
+    '_detect_oily_skin',
+    '_detect_dry_skin',
+    '_detect_wrinkles',
+)
+
+# Process-wide pool shared by all analyzers for concurrent detector runs
+_detector_pool = None
+_detector_pool_lock = threading.Lock()
+
+
+def _get_detector_pool() -> ThreadPoolExecutor:
+    """Create the shared detector thread pool on first use"""
+    global _detector_pool
+    with _detector_pool_lock:
+        if _detector_pool is None:
+            max_workers = int(os.environ.get('SKIN_ANALYZER_POOL_SIZE', os.cpu_count() or 1))
+            _detector_pool = ThreadPoolExecutor(max_workers=max(1, max_workers),
+                                                thread_name_prefix='skin-detector')
+        return _detector_pool
+
+
+def extract_blobs(mask: np.ndarray, intensity: Optional[np.ndarray] = None,
+                  min_area: float = 0.0, max_area: float = np.inf) -> Dict[str, np.ndarray]:
+    """
+    Measure the outer blobs of a binary mask whose area lies strictly
+    between ``min_area`` and ``max_area``, as per-blob arrays.
+    
+    Returns ``index`` (position in findContours(RETR_EXTERNAL) order),
+    ``x``, ``y``, ``width``, ``height``, ``area``, ``perimeter`` and
+    ``circularity``, with exactly the contourArea / arcLength values the
+    detectors were tuned on; with an ``intensity`` plane also ``mean``, the
+    average intensity over each blob's bounding box (read directly or from a
+    summed-area table, whichever is cheaper). Every contour gets a
+    contourArea call, but bounding box and perimeter are only measured for
+    blobs inside the size window; scoring and filtering is vectorized.
+    """
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    all_areas = np.fromiter(map(cv2.contourArea, contours), dtype=np.float64, count=len(contours))
+    index = np.flatnonzero((all_areas > min_area) & (all_areas < max_area))
+    kept = [contours[i] for i in index.tolist()]
+    
+    rects = np.array([cv2.boundingRect(contour) for contour in kept], dtype=np.int64).reshape(-1, 4)
+    x, y, w, h = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+    area = all_areas[index]
+    perimeter = np.fromiter((cv2.arcLength(contour, True) for contour in kept), dtype=np.float64, count=len(kept))
+    circularity = np.divide(4 * np.pi * area, perimeter ** 2,
+                            out=np.zeros_like(area), where=perimeter > 0)
+    
+    blobs = {
+        'index': index, 'x': x, 'y': y, 'width': w, 'height': h,
+        'area': area, 'perimeter': perimeter, 'circularity': circularity
+    }
+    
+    if intensity is not None:
+        box_area = w * h
+        if box_area.sum() + BOX_MEAN_OVERHEAD * len(kept) < intensity.size:
+            # Few, small boxes: reading them directly beats a full-plane table
+            blobs['mean'] = np.fromiter(
+                (cv2.mean(intensity[top:top + height, left:left + width])[0]
+                 for left, top, width, height in rects.tolist()),
+                dtype=np.float64, count=len(kept))
+        else:
+            # Bounding-box sums from a summed-area table
+            table = cv2.integral(intensity, sdepth=cv2.CV_64F)
+            sums = table[y + h, x + w] - table[y, x + w] - table[y + h, x] + table[y, x]
+            blobs['mean'] = np.divide(sums, box_area, out=np.zeros_like(sums), where=box_area > 0)
+    
+    return blobs
+
+
+class PreparedRegion:
+    """
+    A face crop together with the colour planes the detectors need.
+    Each plane is converted on first access and then shared, so a face is
+    converted to HSV, LAB and grayscale at most once per analysis, even when
+    detectors run concurrently.
+    """
+
+    def __init__(self, bgr: np.ndarray):
+        self.bgr = bgr
+        self._hsv = None
+        self._lab = None
+        self._gray = None
+        self._channels = None
+        self._lock = threading.Lock()
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.bgr.shape
+
+    @property
+    def size(self) -> int:
+        return self.bgr.size
+
+    def _plane(self, attr: str, convert):
+        plane = getattr(self, attr)
+        if plane is None:
+            with self._lock:
+                plane = getattr(self, attr)
+                if plane is None:
+                    plane = convert(self.bgr)
+                    setattr(self, attr, plane)
+        return plane
+
+    @property
+    def hsv(self) -> np.ndarray:
+        return self._plane('_hsv', lambda bgr: cv2.cvtColor(bgr, cv2.COLOR_BGR2HSV))
+
+    @property
+    def lab(self) -> np.ndarray:
+        return self._plane('_lab', lambda bgr: cv2.cvtColor(bgr, cv2.COLOR_BGR2LAB))
+
+    @property
+    def gray(self) -> np.ndarray:
+        return self._plane('_gray', lambda bgr: cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY))
+
+    @property
+    def channels(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """B, G and R planes as separate contiguous arrays"""
+        return self._plane('_channels', lambda bgr: tuple(cv2.split(bgr)))
+
+
+class FaceTracker:
+    """
+    Face boxes carried over between consecutive frames of one camera session.
+    
+    After a full cascade run the tracker keeps each face box and a small
+    grayscale template of it. Following frames only template-match inside a
+    window around the previous box; the cascade runs again every
+    ``redetect_interval`` frames or as soon as a match scores below
+    ``min_confidence``.
+    """
+
+    def __init__(self, redetect_interval: int = 10, min_confidence: float = 0.6,
+                 search_margin: float = 0.25):
+        self.redetect_interval = redetect_interval
+        self.min_confidence = min_confidence
+        self.search_margin = search_margin
+        self.boxes = []
+        self.templates = []
+        self.frame_shape = None
+        self.frames_since_detection = 0
+        self.last_used = time.monotonic()
+        self.lock = threading.Lock()
+
+    def needs_detection(self, image: np.ndarray) -> bool:
+        return (not self.boxes
+                or self.frame_shape != image.shape[:2]
+                or self.frames_since_detection >= self.redetect_interval)
+
+    def reset(self, image: np.ndarray, boxes: List[List[int]]):
+        """Start tracking the boxes from a full detection on ``image``"""
+        self.boxes = [list(box) for box in boxes]
+        self.templates = [self._patch(image, box, self._scale(box)) for box in self.boxes]
+        self.frame_shape = image.shape[:2]
+        self.frames_since_detection = 0
+
+    def track(self, image: np.ndarray) -> Optional[List[List[int]]]:
+        """Follow every face into ``image``; None when any match is too weak"""
+        tracked = []
+        for box, template in zip(self.boxes, self.templates):
+            x, y, w, h = box
+            scale = self._scale(box)
+            margin_x = int(w * self.search_margin)
+            margin_y = int(h * self.search_margin)
+            x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+            x1 = min(image.shape[1], x + w + margin_x)
+            y1 = min(image.shape[0], y + h + margin_y)
+            window = self._patch(image, (x0, y0, x1 - x0, y1 - y0), scale)
+            if window.shape[0] < template.shape[0] or window.shape[1] < template.shape[1]:
+                return None
+            
+            scores = cv2.matchTemplate(window, template, cv2.TM_CCOEFF_NORMED)
+            _, best, _, (match_x, match_y) = cv2.minMaxLoc(scores)
+            if best < self.min_confidence:
+                return None
+            tracked.append([x0 + int(round(match_x / scale)), y0 + int(round(match_y / scale)), w, h])
+        
+        self.boxes = tracked
+        self.frames_since_detection += 1
+        return [list(box) for box in tracked]
+
+    @staticmethod
+    def _scale(box) -> float:
+        return min(1.0, TRACK_TEMPLATE_SIZE / max(box[2], box[3]))
+
+    @staticmethod
+    def _patch(image: np.ndarray, box, scale: float) -> np.ndarray:
+        x, y, w, h = box
+        crop = image[y:y+h, x:x+w]
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, round(w * scale)), max(1, round(h * scale))),
+                              interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+
+
+class TrackingSessions:
+    """Bounded registry of FaceTrackers keyed by client session id"""
+
+    def __init__(self, max_sessions: int = 256, idle_timeout: float = 300.0, **tracker_options):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.tracker_options = tracker_options
+        self._trackers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> FaceTracker:
+        now = time.monotonic()
+        with self._lock:
+            # Drop sessions that went idle, oldest first
+            while self._trackers:
+                oldest = next(iter(self._trackers.values()))
+                if now - oldest.last_used <= self.idle_timeout and len(self._trackers) < self.max_sessions:
+                    break
+                self._trackers.popitem(last=False)
+            
+            tracker = self._trackers.pop(session_id, None)
+            if tracker is None:
+                tracker = FaceTracker(**self.tracker_options)
+            tracker.last_used = now
+            self._trackers[session_id] = tracker
+            return tracker
+
+
+# Anything detect_skin_issues_batch accepts as one image: a BGR array,
+# encoded image bytes, or a path to an image file
+BatchImage = Union[np.ndarray, bytes, str, os.PathLike]
+
 
 class OpenCVSkinAnalyzer:
     """
@@ -8,7 +269,42 @@ class OpenCVSkinAnalyzer:
     Works immediately on any Python installation with OpenCV
     """
     
-    def __init__(self):
+    # Bump whenever a change alters which issues are reported, so cached
+    # results from older versions are not reused
+    VERSION = '2.0'
+    
+    def __init__(self, parallelism: Optional[int] = None, min_face_size: Optional[int] = None,
+                 detection_max_side: Optional[int] = None, refine_faces: Optional[bool] = None):
+        # Number of detectors allowed to run at once per analysis; 1 keeps
+        # the original sequential behaviour
+        if parallelism is None:
+            parallelism = int(os.environ.get('SKIN_ANALYZER_PARALLELISM', 1))
+        self.parallelism = max(1, parallelism)
+        
+        # Smallest face, in full-resolution pixels, that must be found. Face
+        # detection runs on a copy scaled so such a face fills the cascade's
+        # MIN_FACE_SIZE window. The default halves each side of the frame:
+        # kiosk faces are far larger, and faces under 60 px carry too little
+        # skin detail to analyze; 30 finds everything full resolution would,
+        # at about 4x the cost
+        if min_face_size is None:
+            min_face_size = int(os.environ.get('SKIN_ANALYZER_MIN_FACE', DEFAULT_MIN_FACE_SIZE))
+        self.min_face_size = max(1, min_face_size)
+        
+        # Cap (0 = none) on the detection copy's longer side, which bounds
+        # detection cost whatever the upload resolution. On frames more than
+        # twice the cap it raises the smallest detectable face above
+        # min_face_size, to MIN_FACE_SIZE * longer side / detection_max_side
+        if detection_max_side is None:
+            detection_max_side = int(os.environ.get('SKIN_ANALYZER_DETECTION_SIDE', DEFAULT_DETECTION_SIDE))
+        self.detection_max_side = max(MIN_FACE_SIZE, detection_max_side) if detection_max_side > 0 else 0
+        
+        # Optionally re-run the cascade on a small crop around each face to
+        # recover the precision lost by downscaling
+        if refine_faces is None:
+            refine_faces = os.environ.get('SKIN_ANALYZER_REFINE_FACES', '0') == '1'
+        self.refine_faces = refine_faces
+        
         try:
             # Initialize OpenCV's Haar cascade face detector
             # This is built into OpenCV, no additional files needed
@@ -21,15 +317,82 @@ class OpenCVSkinAnalyzer:
         except Exception as e:
             print(f"❌ OpenCV initialization error: {e}")
             raise RuntimeError(f"Failed to initialize OpenCV face detection: {e}")
-        
-    def detect_skin_issues(self, image: np.ndarray) -> List[Dict]:
+    
+    @property
+    def settings(self) -> Dict:
+        """Constructor arguments that reproduce this analyzer's behaviour"""
+        return {
+            'parallelism': self.parallelism,
+            'min_face_size': self.min_face_size,
+            'detection_max_side': self.detection_max_side,
+            'refine_faces': self.refine_faces
+        }
+    
+    def detect_skin_issues_batch(self, images: Iterable[BatchImage], workers: Optional[int] = None,
+                                 chunk_size: int = 8) -> Iterator[List[SkinIssue]]:
+        """
+        Analyze many images, yielding each image's issues in input order.
+        
+        Images are sent to a process pool in chunks of ``chunk_size``; every
+        worker builds its own analyzer of this analyzer's class (one cascade
+        load per process) from ``settings``, which subclasses extend with
+        their own constructor arguments. The input is consumed lazily, with at most
+        two chunks per worker in flight, so arbitrarily long streams can be
+        processed in bounded memory. ``workers=1`` runs in this process.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        chunk_size = max(1, chunk_size)
+        
+        if workers <= 1:
+            for image in images:
+                yield self.detect_skin_issues(_load_batch_image(image))
+            return
+        
+        # Processes already use every core, so detectors run sequentially
+        settings = dict(self.settings, parallelism=1)
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                                   initargs=(type(self), settings))
+        pending = deque()
+        try:
+            image_iter = iter(images)
+            while True:
+                chunk = list(islice(image_iter, chunk_size))
+                if not chunk:
+                    break
+                pending.append(pool.submit(_analyze_batch_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            # Don't start queued chunks if the caller stopped early
+            for future in pending:
+                future.cancel()
+            pool.shutdown(wait=True)
+        
+    def detect_skin_issues(self, image: np.ndarray, parallelism: Optional[int] = None,
+                           tracker: Optional[FaceTracker] = None) -> List[SkinIssue]:
         """
         Detect various skin issues in the given image using pure OpenCV techniques.
+        
+        ``parallelism`` overrides the analyzer default for this call; above 1
+        the detectors run on the shared thread pool. Results are merged in
+        face order, then DETECTORS order, so output is the same either way.
+        With a ``tracker`` the faces of the previous frame are followed
+        instead of running the cascade on every frame.
         """
-        issues = []
+        if parallelism is None:
+            parallelism = self.parallelism
         
-        # Detect faces
-        faces = self._detect_faces(image)
+        # Detect (or track) faces
+        with timing.stage('faces'):
+            if tracker is not None:
+                faces = self._track_faces(image, tracker)
+            else:
+                faces = self._detect_faces(image)
+        
+        tasks = []
         
         for i, (x, y, w, h) in enumerate(faces):
             # Ensure coordinates are within image bounds
@@ -38,51 +401,179 @@ class OpenCVSkinAnalyzer:
             w = min(w, image.shape[1] - x)
             h = min(h, image.shape[0] - y)
             
-            # Extract face region
-            face_region = image[y:y+h, x:x+w]
+            # Extract face region; colour planes are converted lazily and
+            # shared between all detectors
+            face_region = PreparedRegion(image[y:y+h, x:x+w])
             
             if face_region.size > 0:
                 # Detect various skin issues
-                acne_issues = self._detect_acne(face_region, x, y)
-                dark_spot_issues = self._detect_dark_spots(face_region, x, y)
-                redness_issues = self._detect_redness(face_region, x, y)
-                oily_issues = self._detect_oily_skin(face_region, x, y)
-                dryness_issues = self._detect_dry_skin(face_region, x, y)
-                wrinkle_issues = self._detect_wrinkles(face_region, x, y)
-                
-                issues.extend(acne_issues)
-                issues.extend(dark_spot_issues)
-                issues.extend(redness_issues)
-                issues.extend(oily_issues)
-                issues.extend(dryness_issues)
-                issues.extend(wrinkle_issues)
+                for name in DETECTORS:
+                    tasks.append((name, face_region, x, y))
+        
+        if parallelism > 1 and len(tasks) > 1:
+            results = self._run_concurrently(tasks, parallelism)
+        else:
+            results = [self._run_detector(*task) for task in tasks]
+        
+        issues = []
+        for detector_issues in results:
+            issues.extend(detector_issues)
         
         return issues
     
+    def _run_detector(self, name: str, face_region: PreparedRegion, x: int, y: int) -> List[SkinIssue]:
+        """Run one detector, timed as a stage named after the issue it finds"""
+        with timing.stage(name[len('_detect_'):]):
+            return getattr(self, name)(face_region, x, y)
+    
+    def _run_concurrently(self, tasks: List[Tuple], parallelism: int) -> List[List[SkinIssue]]:
+        """Run detector tasks on the shared pool, at most ``parallelism`` at a time"""
+        pool = _get_detector_pool()
+        slots = threading.BoundedSemaphore(parallelism)
+        futures = []
+        for task in tasks:
+            slots.acquire()
+            # Carry the request's timing context into the pool thread
+            future = pool.submit(timing.bind(self._run_detector), *task)
+            future.add_done_callback(lambda _: slots.release())
+            futures.append(future)
+        
+        # Collect in submission order to keep output deterministic
+        return [future.result() for future in futures]
+    
+    @staticmethod
+    def _prepare(face_region: Union[np.ndarray, PreparedRegion]) -> PreparedRegion:
+        """Wrap a raw BGR crop so detectors can be called on their own"""
+        if isinstance(face_region, PreparedRegion):
+            return face_region
+        return PreparedRegion(face_region)
+    
+    def detection_scale(self, height: int, width: int) -> float:
+        """
+        Downscale factor for the cascade pass over a ``width`` x ``height``
+        frame. Faces smaller than ``MIN_FACE_SIZE / scale`` full-resolution
+        pixels are not detected.
+        """
+        scale = min(1.0, MIN_FACE_SIZE / self.min_face_size)
+        if self.detection_max_side:
+            scale = min(scale, self.detection_max_side / max(height, width))
+        return scale
+    
     def _detect_faces(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
-        """Detect faces using OpenCV Haar cascade"""
+        """
+        Detect faces using OpenCV Haar cascade.
+        
+        The cascade runs on a copy downscaled by ``detection_scale`` and the
+        boxes are mapped back to full-resolution coordinates, optionally
+        refined on a small crop around each face.
+        """
         try:
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            height, width = image.shape[:2]
+            scale = self.detection_scale(height, width)
+            
+            # Downscale before the grayscale conversion so neither touches
+            # the full-resolution frame
+            if scale < 1.0:
+                small = cv2.resize(image, (max(1, round(width * scale)), max(1, round(height * scale))),
+                                   interpolation=cv2.INTER_AREA)
+            else:
+                small = image
+            gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
             
-            # Use Haar cascade method (reliable and fast)
+            # Use Haar cascade method (reliable and fast); no upper size limit
+            # since the detection image is already bounded
             faces = self.face_cascade.detectMultiScale(
                 gray, 
                 scaleFactor=1.1, 
                 minNeighbors=5, 
-                minSize=(30, 30),
-                maxSize=(300, 300)  # Add max size for better performance
+                minSize=(MIN_FACE_SIZE, MIN_FACE_SIZE)
             )
-            return faces.tolist() if len(faces) > 0 else []
+            if len(faces) == 0:
+                return []
+            
+            boxes = [[int(round(v / scale)) for v in face] for face in faces.tolist()]
+            if self.refine_faces:
+                boxes = [self._refine_face(image, box) for box in boxes]
+            return boxes
         except Exception as e:
             print(f"Face detection error: {e}")
             return []
     
-    def _detect_acne(self, face_region: np.ndarray, offset_x: int, offset_y: int) -> List[Dict]:
+    def _track_faces(self, image: np.ndarray, tracker: FaceTracker) -> List[List[int]]:
+        """Follow the tracker's faces, falling back to full detection when tracking is unsure"""
+        with tracker.lock:
+            if not tracker.needs_detection(image):
+                faces = tracker.track(image)
+                if faces is not None:
+                    return faces
+            
+            faces = self._detect_faces(image)
+            tracker.reset(image, faces)
+            return faces
+    
+    def _refine_face(self, image: np.ndarray, box: List[int]) -> List[int]:
+        """Re-detect a face on a crop around its coarse box, keeping the box if that fails"""
+        x, y, w, h = box
+        margin_x, margin_y = w // 4, h // 4
+        x0, y0 = max(0, x - margin_x), max(0, y - margin_y)
+        x1 = min(image.shape[1], x + w + margin_x)
+        y1 = min(image.shape[0], y + h + margin_y)
+        
+        # Rescale the crop so the face is about REFINE_FACE_SIZE pixels
+        scale = min(1.0, REFINE_FACE_SIZE / max(w, h))
+        crop = image[y0:y1, x0:x1]
+        if scale < 1.0:
+            crop = cv2.resize(crop, (max(1, round((x1 - x0) * scale)), max(1, round((y1 - y0) * scale))),
+                              interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
+        
+        expected = max(w, h) * scale
+        min_side = max(MIN_FACE_SIZE, int(expected * 0.7))
+        faces = self.face_cascade.detectMultiScale(
+            gray,
+            scaleFactor=1.05,
+            minNeighbors=3,
+            minSize=(min_side, min_side),
+            maxSize=(int(expected * 1.3) + 1, int(expected * 1.3) + 1)
+        )
+        if len(faces) == 0:
+            return box
+        
+        # The largest hit is the face the coarse box was centred on
+        fx, fy, fw, fh = max(faces.tolist(), key=lambda f: f[2] * f[3])
+        return [
+            x0 + int(round(fx / scale)),
+            y0 + int(round(fy / scale)),
+            int(round(fw / scale)),
+            int(round(fh / scale))
+        ]
+    
+    def _blob_issues(self, blobs: Dict[str, np.ndarray], keep: np.ndarray, confidence: np.ndarray,
+                     issue_type: str, id_prefix: str, offset_x: int, offset_y: int) -> List[SkinIssue]:
+        """Turn the blobs selected by ``keep`` into SkinIssue records"""
+        selected = np.flatnonzero(keep)
+        if selected.size == 0:
+            return []
+        
+        # One conversion per column to native Python numbers
+        indices = blobs['index'][selected].tolist()
+        xs = blobs['x'][selected].tolist()
+        ys = blobs['y'][selected].tolist()
+        widths = blobs['width'][selected].tolist()
+        heights = blobs['height'][selected].tolist()
+        confidences = confidence[selected].astype(np.float64).tolist()
+        
+        return [
+            SkinIssue(f"{id_prefix}_{i}_{x}_{y}", issue_type, conf, offset_x + x, offset_y + y, w, h)
+            for i, x, y, w, h, conf in zip(indices, xs, ys, widths, heights, confidences)
+        ]
+    
+    def _detect_acne(self, face_region: Union[np.ndarray, PreparedRegion], offset_x: int, offset_y: int) -> List[SkinIssue]:
         """Detect acne-like spots using color and texture analysis"""
-        issues = []
+        face_region = self._prepare(face_region)
         
-        # Convert to HSV for better color analysis
-        hsv = cv2.cvtColor(face_region, cv2.COLOR_BGR2HSV)
+        # HSV for better color analysis
+        hsv = face_region.hsv
         
         # Define HSV range for reddish/inflamed skin (acne indicators)
         lower_red1 = np.array([0, 40, 40])
@@ -99,46 +590,25 @@ class OpenCVSkinAnalyzer:
         red_mask = cv2.morphologyEx(red_mask, cv2.MORPH_OPEN, kernel)
         red_mask = cv2.morphologyEx(red_mask, cv2.MORPH_CLOSE, kernel)
         
-        # Find contours
-        contours, _ = cv2.findContours(red_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for i, contour in enumerate(contours):
-            area = cv2.contourArea(contour)
-            if 8 < area < 600:  # Filter by reasonable acne spot size
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Calculate confidence based on color intensity, size, and circularity
-                perimeter = cv2.arcLength(contour, True)
-                if perimeter > 0:
-                    circularity = 4 * np.pi * area / (perimeter ** 2)
-                    circularity_score = min(1.0, circularity * 2)  # Boost circular shapes
-                else:
-                    circularity_score = 0.5
-                
-                size_score = min(1.0, area / 300)
-                confidence = min(0.95, size_score * 0.4 + circularity_score * 0.4 + 0.2)
-                
-                if confidence > 0.3:
-                    issues.append({
-                        'id': f"acne_{i}_{x}_{y}",
-                        'type': 'acne',
-                        'confidence': float(confidence),
-                        'bbox': {
-                            'x': int(offset_x + x),
-                            'y': int(offset_y + y),
-                            'width': int(w),
-                            'height': int(h)
-                        }
-                    })
+        # Measure candidate spots of a reasonable acne size
+        blobs = extract_blobs(red_mask, min_area=8, max_area=600)
+        area = blobs['area']
         
-        return issues
+        # Confidence based on size and circularity (circular shapes boosted)
+        circularity_score = np.where(blobs['perimeter'] > 0,
+                                     np.minimum(1.0, blobs['circularity'] * 2), 0.5)
+        size_score = np.minimum(1.0, area / 300)
+        confidence = np.minimum(0.95, size_score * 0.4 + circularity_score * 0.4 + 0.2)
+        
+        keep = confidence > 0.3
+        return self._blob_issues(blobs, keep, confidence, 'acne', 'acne', offset_x, offset_y)
     
-    def _detect_dark_spots(self, face_region: np.ndarray, offset_x: int, offset_y: int) -> List[Dict]:
+    def _detect_dark_spots(self, face_region: Union[np.ndarray, PreparedRegion], offset_x: int, offset_y: int) -> List[SkinIssue]:
         """Detect dark spots and hyperpigmentation"""
-        issues = []
+        face_region = self._prepare(face_region)
         
-        # Convert to LAB color space for better analysis
-        lab = cv2.cvtColor(face_region, cv2.COLOR_BGR2LAB)
+        # LAB color space for better analysis
+        lab = face_region.lab
         l_channel = lab[:, :, 0]
         
         # Create mask for dark regions using multiple methods
@@ -158,52 +628,26 @@ class OpenCVSkinAnalyzer:
         dark_mask = cv2.morphologyEx(dark_mask, cv2.MORPH_OPEN, kernel)
         dark_mask = cv2.morphologyEx(dark_mask, cv2.MORPH_CLOSE, kernel)
         
-        # Find contours
-        contours, _ = cv2.findContours(dark_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for i, contour in enumerate(contours):
-            area = cv2.contourArea(contour)
-            if 12 < area < 1000:  # Filter by reasonable size
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Calculate confidence based on darkness and shape
-                roi = l_channel[y:y+h, x:x+w]
-                if roi.size > 0:
-                    avg_darkness = 255 - np.mean(roi)
-                    darkness_score = min(1.0, avg_darkness / 128)
-                    
-                    # Shape analysis for more accurate detection
-                    perimeter = cv2.arcLength(contour, True)
-                    if perimeter > 0:
-                        circularity = 4 * np.pi * area / (perimeter ** 2)
-                        shape_score = min(1.0, circularity * 1.5)
-                    else:
-                        shape_score = 0.3
-                    
-                    confidence = min(0.92, darkness_score * 0.6 + shape_score * 0.3 + 0.1)
-                    
-                    if confidence > 0.35:
-                        issues.append({
-                            'id': f"dark_spot_{i}_{x}_{y}",
-                            'type': 'dark_spots',
-                            'confidence': float(confidence),
-                            'bbox': {
-                                'x': int(offset_x + x),
-                                'y': int(offset_y + y),
-                                'width': int(w),
-                                'height': int(h)
-                            }
-                        })
+        # Measure reasonably sized candidate spots, with mean lightness over each bbox
+        blobs = extract_blobs(dark_mask, l_channel, min_area=12, max_area=1000)
+        area = blobs['area']
         
-        return issues
+        # Confidence based on darkness and shape
+        darkness_score = np.minimum(1.0, (255 - blobs['mean']) / 128)
+        shape_score = np.where(blobs['perimeter'] > 0,
+                               np.minimum(1.0, blobs['circularity'] * 1.5), 0.3)
+        confidence = np.minimum(0.92, darkness_score * 0.6 + shape_score * 0.3 + 0.1)
+        
+        keep = confidence > 0.35
+        return self._blob_issues(blobs, keep, confidence, 'dark_spots', 'dark_spot', offset_x, offset_y)
     
-    def _detect_redness(self, face_region: np.ndarray, offset_x: int, offset_y: int) -> List[Dict]:
+    def _detect_redness(self, face_region: Union[np.ndarray, PreparedRegion], offset_x: int, offset_y: int) -> List[SkinIssue]:
         """Detect skin redness and irritation"""
-        issues = []
+        face_region = self._prepare(face_region)
         
         # Multi-method redness detection
-        hsv = cv2.cvtColor(face_region, cv2.COLOR_BGR2HSV)
-        lab = cv2.cvtColor(face_region, cv2.COLOR_BGR2LAB)
+        hsv = face_region.hsv
+        lab = face_region.lab
         
         # Method 1: HSV red detection
         red_mask1 = cv2.inRange(hsv, np.array([0, 30, 30]), np.array([10, 255, 255]))
@@ -215,7 +659,7 @@ class OpenCVSkinAnalyzer:
         _, lab_red = cv2.threshold(a_channel, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
         # Method 3: RGB ratio analysis
-        b, g, r = cv2.split(face_region)
+        b, g, r = face_region.channels
         red_dominance = cv2.divide(r.astype(np.float32), 
                                  (g.astype(np.float32) + b.astype(np.float32) + 1))
         _, ratio_mask = cv2.threshold((red_dominance * 255).astype(np.uint8), 
@@ -230,45 +674,25 @@ class OpenCVSkinAnalyzer:
         combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_CLOSE, kernel)
         combined_mask = cv2.morphologyEx(combined_mask, cv2.MORPH_OPEN, kernel)
         
-        # Find contours
-        contours, _ = cv2.findContours(combined_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for i, contour in enumerate(contours):
-            area = cv2.contourArea(contour)
-            if 50 < area < 2500:  # Reasonable size for redness areas
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Calculate confidence
-                roi_a = a_channel[y:y+h, x:x+w]
-                if roi_a.size > 0:
-                    redness_intensity = np.mean(roi_a)
-                    intensity_score = min(1.0, max(0, (redness_intensity - 128) / 64))
-                    
-                    area_score = min(1.0, area / 1000)
-                    confidence = min(0.88, intensity_score * 0.7 + area_score * 0.2 + 0.1)
-                    
-                    if confidence > 0.4:
-                        issues.append({
-                            'id': f"redness_{i}_{x}_{y}",
-                            'type': 'redness',
-                            'confidence': float(confidence),
-                            'bbox': {
-                                'x': int(offset_x + x),
-                                'y': int(offset_y + y),
-                                'width': int(w),
-                                'height': int(h)
-                            }
-                        })
+        # Measure redness-sized candidate areas, with mean A-channel over each bbox
+        blobs = extract_blobs(combined_mask, a_channel, min_area=50, max_area=2500)
+        area = blobs['area']
         
-        return issues
+        # Calculate confidence
+        intensity_score = np.clip((blobs['mean'] - 128) / 64, 0, 1.0)
+        area_score = np.minimum(1.0, area / 1000)
+        confidence = np.minimum(0.88, intensity_score * 0.7 + area_score * 0.2 + 0.1)
+        
+        keep = confidence > 0.4
+        return self._blob_issues(blobs, keep, confidence, 'redness', 'redness', offset_x, offset_y)
     
-    def _detect_oily_skin(self, face_region: np.ndarray, offset_x: int, offset_y: int) -> List[Dict]:
+    def _detect_oily_skin(self, face_region: Union[np.ndarray, PreparedRegion], offset_x: int, offset_y: int) -> List[SkinIssue]:
         """Detect oily/shiny skin areas"""
-        issues = []
+        face_region = self._prepare(face_region)
         
-        # Convert to different color spaces for shine detection
-        lab = cv2.cvtColor(face_region, cv2.COLOR_BGR2LAB)
-        hsv = cv2.cvtColor(face_region, cv2.COLOR_BGR2HSV)
+        # Different color spaces for shine detection
+        lab = face_region.lab
+        hsv = face_region.hsv
         
         l_channel = lab[:, :, 0]
         v_channel = hsv[:, :, 2]
@@ -287,44 +711,24 @@ class OpenCVSkinAnalyzer:
         shine_mask = cv2.morphologyEx(shine_mask, cv2.MORPH_CLOSE, kernel)
         shine_mask = cv2.morphologyEx(shine_mask, cv2.MORPH_OPEN, kernel)
         
-        # Find contours
-        contours, _ = cv2.findContours(shine_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for i, contour in enumerate(contours):
-            area = cv2.contourArea(contour)
-            if 80 < area < 4000:  # Reasonable size for oily areas
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Calculate confidence
-                roi = combined[y:y+h, x:x+w]
-                if roi.size > 0:
-                    avg_brightness = np.mean(roi)
-                    brightness_score = min(1.0, max(0, (avg_brightness - 150) / 105))
-                    
-                    area_score = min(1.0, area / 2000)
-                    confidence = min(0.85, brightness_score * 0.6 + area_score * 0.3 + 0.1)
-                    
-                    if confidence > 0.35:
-                        issues.append({
-                            'id': f"oily_{i}_{x}_{y}",
-                            'type': 'oily_skin',
-                            'confidence': float(confidence),
-                            'bbox': {
-                                'x': int(offset_x + x),
-                                'y': int(offset_y + y),
-                                'width': int(w),
-                                'height': int(h)
-                            }
-                        })
+        # Measure oily-area-sized candidates, with mean brightness over each bbox
+        blobs = extract_blobs(shine_mask, combined, min_area=80, max_area=4000)
+        area = blobs['area']
         
-        return issues
+        # Calculate confidence
+        brightness_score = np.clip((blobs['mean'] - 150) / 105, 0, 1.0)
+        area_score = np.minimum(1.0, area / 2000)
+        confidence = np.minimum(0.85, brightness_score * 0.6 + area_score * 0.3 + 0.1)
+        
+        keep = confidence > 0.35
+        return self._blob_issues(blobs, keep, confidence, 'oily_skin', 'oily', offset_x, offset_y)
     
-    def _detect_dry_skin(self, face_region: np.ndarray, offset_x: int, offset_y: int) -> List[Dict]:
+    def _detect_dry_skin(self, face_region: Union[np.ndarray, PreparedRegion], offset_x: int, offset_y: int) -> List[SkinIssue]:
         """Detect dry skin areas using texture analysis"""
-        issues = []
+        face_region = self._prepare(face_region)
         
-        # Convert to grayscale for texture analysis
-        gray = cv2.cvtColor(face_region, cv2.COLOR_BGR2GRAY)
+        # Grayscale for texture analysis
+        gray = face_region.gray
         
         # Multiple texture analysis methods
         # Method 1: Laplacian (edge detection)
@@ -347,44 +751,24 @@ class OpenCVSkinAnalyzer:
         kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (5, 5))
         dry_mask = cv2.morphologyEx(dry_mask, cv2.MORPH_CLOSE, kernel)
         
-        # Find contours
-        contours, _ = cv2.findContours(dry_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        for i, contour in enumerate(contours):
-            area = cv2.contourArea(contour)
-            if 150 < area < 6000:  # Reasonable size for dry areas
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # Calculate confidence
-                roi = texture_map[y:y+h, x:x+w]
-                if roi.size > 0:
-                    avg_roughness = np.mean(roi)
-                    roughness_score = min(1.0, avg_roughness / 255)
-                    
-                    area_score = min(1.0, area / 3000)
-                    confidence = min(0.78, roughness_score * 0.6 + area_score * 0.2 + 0.1)
-                    
-                    if confidence > 0.3:
-                        issues.append({
-                            'id': f"dryness_{i}_{x}_{y}",
-                            'type': 'dryness',
-                            'confidence': float(confidence),
-                            'bbox': {
-                                'x': int(offset_x + x),
-                                'y': int(offset_y + y),
-                                'width': int(w),
-                                'height': int(h)
-                            }
-                        })
+        # Measure dry-area-sized candidates, with mean roughness over each bbox
+        blobs = extract_blobs(dry_mask, texture_map, min_area=150, max_area=6000)
+        area = blobs['area']
         
-        return issues
+        # Calculate confidence
+        roughness_score = np.minimum(1.0, blobs['mean'] / 255)
+        area_score = np.minimum(1.0, area / 3000)
+        confidence = np.minimum(0.78, roughness_score * 0.6 + area_score * 0.2 + 0.1)
+        
+        keep = confidence > 0.3
+        return self._blob_issues(blobs, keep, confidence, 'dryness', 'dryness', offset_x, offset_y)
     
-    def _detect_wrinkles(self, face_region: np.ndarray, offset_x: int, offset_y: int) -> List[Dict]:
+    def _detect_wrinkles(self, face_region: Union[np.ndarray, PreparedRegion], offset_x: int, offset_y: int) -> List[SkinIssue]:
         """Detect wrinkles and fine lines"""
-        issues = []
+        face_region = self._prepare(face_region)
         
-        # Convert to grayscale
-        gray = cv2.cvtColor(face_region, cv2.COLOR_BGR2GRAY)
+        # Grayscale plane
+        gray = face_region.gray
         
         # Apply Gaussian blur to reduce noise
         blurred = cv2.GaussianBlur(gray, (3, 3), 0)
@@ -396,41 +780,51 @@ class OpenCVSkinAnalyzer:
         lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=30, 
                                minLineLength=20, maxLineGap=5)
         
-        if lines is not None:
-            for i, line in enumerate(lines):
-                x1, y1, x2, y2 = line[0]
-                
-                # Calculate line length and angle
-                length = np.sqrt((x2-x1)**2 + (y2-y1)**2)
-                
-                if length > 15:  # Minimum wrinkle length
-                    # Create bounding box around the line
-                    x = min(x1, x2) - 5
-                    y = min(y1, y2) - 5
-                    w = abs(x2 - x1) + 10
-                    h = abs(y2 - y1) + 10
-                    
-                    # Ensure bounds
-                    x = max(0, x)
-                    y = max(0, y)
-                    w = min(w, face_region.shape[1] - x)
-                    h = min(h, face_region.shape[0] - y)
-                    
-                    # Calculate confidence based on line properties
-                    length_score = min(1.0, length / 50)
-                    confidence = min(0.75, length_score * 0.7 + 0.2)
-                    
-                    if confidence > 0.4 and w > 0 and h > 0:
-                        issues.append({
-                            'id': f"wrinkles_{i}_{x}_{y}",
-                            'type': 'wrinkles',
-                            'confidence': float(confidence),
-                            'bbox': {
-                                'x': int(offset_x + x),
-                                'y': int(offset_y + y),
-                                'width': int(w),
-                                'height': int(h)
-                            }
-                        })
+        if lines is None:
+            return []
         
-        return issues
+        x1, y1, x2, y2 = lines.reshape(-1, 4).astype(np.int64).T
+        
+        # Line length of every segment at once
+        length = np.hypot(x2 - x1, y2 - y1)
+        
+        # Bounding box around each line, clipped to the face region
+        x = np.maximum(0, np.minimum(x1, x2) - 5)
+        y = np.maximum(0, np.minimum(y1, y2) - 5)
+        w = np.minimum(np.abs(x2 - x1) + 10, face_region.shape[1] - x)
+        h = np.minimum(np.abs(y2 - y1) + 10, face_region.shape[0] - y)
+        
+        # Calculate confidence based on line properties
+        length_score = np.minimum(1.0, length / 50)
+        confidence = np.minimum(0.75, length_score * 0.7 + 0.2)
+        
+        # Minimum wrinkle length
+        keep = (length > 15) & (confidence > 0.4) & (w > 0) & (h > 0)
+        lines_table = {'index': np.arange(len(x)), 'x': x, 'y': y, 'width': w, 'height': h}
+        return self._blob_issues(lines_table, keep, confidence, 'wrinkles', 'wrinkles', offset_x, offset_y)
+
+
+# Analyzer owned by a batch worker process, built once by _init_batch_worker
+_batch_analyzer = None
+
+
+def _init_batch_worker(analyzer_class: type, settings: Dict):
+    global _batch_analyzer
+    _batch_analyzer = analyzer_class(**settings)
+
+
+def _analyze_batch_chunk(images: List[BatchImage]) -> List[List[SkinIssue]]:
+    return [_batch_analyzer.detect_skin_issues(_load_batch_image(image)) for image in images]
+
+
+def _load_batch_image(image: BatchImage) -> np.ndarray:
+    """Decode a batch item to a BGR array"""
+    if isinstance(image, np.ndarray):
+        return image
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        decoded = cv2.imdecode(np.frombuffer(image, dtype=np.uint8), cv2.IMREAD_COLOR)
+    else:
+        decoded = cv2.imread(os.fspath(image), cv2.IMREAD_COLOR)
+    if decoded is None:
+        raise ValueError("Could not decode batch image")
+    return decoded
@@ -0,0 +1,176 @@
+"""
+Per-stage timing for the analysis pipeline.
+
+Code marks a stage with ``with timing.stage('faces'):``. While a request is
+being timed (see ``start_request``) the wall time and call count of every
+stage are recorded for that request and merged into process-wide
+histograms when it finishes. Outside a timed request ``stage`` returns a
+shared no-op context manager, so instrumentation costs next to nothing
+when disabled.
+"""
+
+import os
+import threading
+import time
+import contextvars
+from typing import Dict, Optional
+
+# Upper bounds, in milliseconds, of the histogram buckets
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+_current = contextvars.ContextVar('request_timings', default=None)
+
+
+def is_enabled() -> bool:
+    """Timing is switched on with BOOTS_TIMING=1"""
+    return os.environ.get('BOOTS_TIMING', '0') == '1'
+
+
+class RequestTimings:
+    """Stage durations and call counts for one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float):
+        # Detectors may report from several threads at once
+        with self._lock:
+            entry = self.stages.get(name)
+            if entry is None:
+                self.stages[name] = [seconds, 1]
+            else:
+                entry[0] += seconds
+                entry[1] += 1
+
+    def server_timing(self) -> str:
+        """Format the breakdown as a Server-Timing header value"""
+        parts = []
+        for name, (seconds, count) in self.stages.items():
+            part = f"{name};dur={seconds * 1000:.2f}"
+            if count > 1:
+                part += f';desc="{count} calls"'
+            parts.append(part)
+        return ', '.join(parts)
+
+
+class _Stage:
+    __slots__ = ('timings', 'name', 'started')
+
+    def __init__(self, timings: RequestTimings, name: str):
+        self.timings = timings
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.timings.add(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name: str):
+    """Context manager timing one pipeline stage of the current request"""
+    timings = _current.get()
+    if timings is None:
+        return _NULL_STAGE
+    return _Stage(timings, name)
+
+
+class StageHistogram:
+    """Latency histogram for one stage across all requests"""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, ms: float, calls: int):
+        index = 0
+        while index < len(BUCKET_BOUNDS_MS) and ms > BUCKET_BOUNDS_MS[index]:
+            index += 1
+        self.buckets[index] += 1
+        self.count += 1
+        self.calls += calls
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def to_dict(self) -> Dict:
+        bounds = [str(bound) for bound in BUCKET_BOUNDS_MS] + ['+Inf']
+        return {
+            'count': self.count,
+            'calls': self.calls,
+            'total_ms': round(self.total_ms, 3),
+            'mean_ms': round(self.total_ms / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max_ms, 3),
+            'buckets': dict(zip(bounds, self.buckets))
+        }
+
+
+class TimingRegistry:
+    """Process-wide per-stage histograms"""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, timings: RequestTimings):
+        with self._lock:
+            for name, (seconds, count) in timings.stages.items():
+                histogram = self._histograms.get(name)
+                if histogram is None:
+                    histogram = self._histograms[name] = StageHistogram()
+                histogram.observe(seconds * 1000, count)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: histogram.to_dict() for name, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+registry = TimingRegistry()
+
+
+def start_request() -> Optional[RequestTimings]:
+    """Begin timing the current request; returns None when timing is disabled"""
+    if not is_enabled():
+        return None
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def finish_request(timings: Optional[RequestTimings]) -> Optional[str]:
+    """Record the request's stages and return its Server-Timing header value"""
+    if timings is None:
+        return None
+    _current.set(None)
+    timings.add('total', time.perf_counter() - timings.started)
+    registry.record(timings)
+    return timings.server_timing()
+
+
+def bind(func):
+    """Wrap ``func`` so it reports into the caller's request when run on another thread"""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(func, *args, **kwargs)
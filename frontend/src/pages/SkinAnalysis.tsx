@@ -33,6 +33,7 @@ const RefreshIcon = () => (
 
 const SkinAnalysis: React.FC = () => {
   const webcamRef = useRef<Webcam>(null);
+  const sessionIdRef = useRef<string>(`session-${Date.now()}-${Math.random().toString(36).slice(2)}`);
   const navigate = useNavigate();
   
   const [isAnalyzing, setIsAnalyzing] = useState(false);
@@ -121,7 +122,7 @@ const SkinAnalysis: React.FC = () => {
         const imageSrc = webcamRef.current.getScreenshot();
         if (imageSrc) {
           console.log('Sending image for analysis...');
-          const result = await skinAnalysisAPI.analyzeSkinFrame(imageSrc);
+          const result = await skinAnalysisAPI.analyzeSkinFrame(imageSrc, sessionIdRef.current);
           console.log('Analysis result:', result);
           setCurrentAnalysisId(result.id);
           setDetectedIssues(result.issues);
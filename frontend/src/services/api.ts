@@ -31,10 +31,14 @@ export const skinAnalysisAPI = {
     return response.data;
   },
 
-  // Analyze skin from camera frame
-  analyzeSkinFrame: async (imageData: string): Promise<AnalysisResult> => {
-    const response = await api.post('/analyze', {
-      image: imageData,
+  // Analyze skin from camera frame; frames sharing a sessionId let the
+  // backend track the face instead of re-detecting it every time.
+  // The frame is uploaded as raw image bytes rather than base64 JSON.
+  analyzeSkinFrame: async (imageData: string, sessionId?: string): Promise<AnalysisResult> => {
+    const blob = await (await fetch(imageData)).blob();
+    const response = await api.post('/analyze', blob, {
+      headers: { 'Content-Type': blob.type || 'image/jpeg' },
+      params: sessionId ? { session_id: sessionId } : undefined,
     });
     return response.data;
   },